@@ -1,18 +1,23 @@
 import streamlit as st
-from PIL import Image
+
+from utils.backends import start_backend
+from utils.profiling import finish_rerun, profile_panel, stage, start_rerun
+from utils.sidebar import sidebar_header
 
 st.set_page_config(
     page_title="Home",
     page_icon=":dart:"
 )
 
-# image_path = 'C:/Users/atano/ComunidadeDS/repos/ftc_programacao_python/Ciclo_06-Visualizacao_interativa/'
-image = Image.open('logo.png')
-st.sidebar.image(image, width=120)
+start_rerun('Home')
+
+# Começa a carregar o dataset (ou a gerar o banco SQLite, com
+# CURRY_BACKEND=sql) enquanto a Home é exibida
+start_backend('dataset/train.csv')
 
-st.sidebar.markdown('# Cury Company')
-st.sidebar.markdown('## Fastest Delivery in Town')
-st.sidebar.markdown("""---""")
+with stage('barra lateral'):
+    #Logo em cache no processo
+    sidebar_header()
 
 st.write("# Curry Company Growth Dashboard")
 
@@ -32,4 +37,6 @@ st.markdown(
     - Time de Data Science no Discord
         - @jônata
 
-""")
\ No newline at end of file
+""")
+
+profile_panel(finish_rerun())
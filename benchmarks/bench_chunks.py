@@ -0,0 +1,94 @@
+# ==========================
+# Benchmark e conferência da leitura do CSV em blocos
+#
+# Carrega o dataset pelo caminho do aquecimento (utils.warmup.parallel_load,
+# em um único processo) com vários tamanhos de bloco e compara com a leitura
+# do arquivo inteiro de uma vez (prepare_data sobre o read_csv completo).
+# Cada carga roda em um interpretador novo, que informa o tempo e o pico de
+# memória residente (VmHWM do Linux; o ru_maxrss herdaria o pico do processo
+# do benchmark). Antes, confere que o DataFrame e os
+# artefatos das páginas lidos em blocos são iguais aos da leitura completa.
+#
+# Uso:
+#   python -m benchmarks.bench_chunks --csv dataset/train.csv --blocos 10000 100000
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+import pandas as pd
+
+from utils.data_loader import file_signature, prepare_data, read_dataset
+from utils.rollup import orders_by
+from utils.stats import summarize
+from utils.warmup import parallel_load
+
+# Executado no interpretador novo: carga pelo caminho pedido e medições
+_MEDIDOR = '''
+import json, sys, time
+from utils.data_loader import file_signature, prepare_data, read_dataset
+from utils.warmup import parallel_load
+
+csv, blocos = sys.argv[1], int(sys.argv[2])
+inicio = time.perf_counter()
+if blocos:
+    df, _ = parallel_load(file_signature(csv), processos=1, chunksize=blocos)
+else:
+    df = prepare_data(read_dataset(csv))
+segundos = time.perf_counter() - inicio
+with open('/proc/self/status') as status:
+    pico = next(int(linha.split()[1]) for linha in status if linha.startswith('VmHWM'))
+print(json.dumps({'segundos': segundos, 'pico_mb': pico / 2**10}))
+'''
+
+
+def conferir(csv, blocos):
+    
+    """ DataFrame, rollup e estatísticas lidos em blocos iguais aos da leitura completa """
+    
+    completo = prepare_data(read_dataset(csv))
+    df, derivados = parallel_load(file_signature(csv), processos=1, chunksize=blocos)
+    
+    pd.testing.assert_frame_equal(df, completo)
+    
+    rollup = derivados['rollup_empresa'][0]
+    pd.testing.assert_frame_equal(orders_by(rollup, ['Order_Date', 'City']), orders_by(derivados['rollup_empresa'][1](completo), ['Order_Date', 'City']))
+    
+    estatisticas = derivados['estatisticas_paineis'][0]
+    esperado = derivados['estatisticas_paineis'][1](completo)
+    pd.testing.assert_frame_equal(summarize(estatisticas['tempo'], ['City', 'Festival']), summarize(esperado['tempo'], ['City', 'Festival']), rtol=1e-9)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Pico de memória da carga: CSV inteiro x leitura em blocos')
+    parser.add_argument('--csv', default='dataset/train.csv')
+    parser.add_argument('--blocos', type=int, nargs='+', default=[10_000, 100_000])
+    args = parser.parse_args()
+    
+    # Cópia em uma pasta temporária: sem arquivo colunar, a carga sempre lê o CSV
+    destino = tempfile.mkdtemp(prefix='bench_chunks_')
+    try:
+        csv = shutil.copy(args.csv, os.path.join(destino, 'train.csv'))
+        conferir(csv, min(args.blocos))
+        
+        print(f"{'leitura':>22} {'carga (s)':>10} {'pico (MB)':>10}")
+        
+        for blocos in [0] + args.blocos:
+            for arquivo in os.listdir(destino):
+                if arquivo != 'train.csv':
+                    os.remove(os.path.join(destino, arquivo))
+            
+            saida = subprocess.run([sys.executable, '-c', _MEDIDOR, csv, str(blocos)], capture_output=True, text=True, check=True)
+            medida = json.loads(saida.stdout)
+            nome = f'blocos de {blocos}' if blocos else 'arquivo inteiro'
+            print(f"{nome:>22} {medida['segundos']:>10.2f} {medida['pico_mb']:>10.0f}")
+    finally:
+        shutil.rmtree(destino)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+# ==========================
+# Benchmark do clean_code
+#
+# Compara a limpeza original (strip e filtro coluna a coluna via .loc) com a
+# limpeza vetorizada de utils.data_loader, sobre o train.csv replicado 10x e
+# 100x. Mede o tempo de parede e o pico de memória (tracemalloc) de leitura +
+# limpeza em cada implementação.
+#
+# Uso:
+#   python -m benchmarks.bench_clean_code --csv dataset/train.csv --fatores 10 100
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+from utils.data_loader import clean_code, read_dataset
+
+
+def clean_code_original(df):
+    
+    """ Implementação original do clean_code, mantida apenas para comparação
+        
+        Input: Dataframe
+        Output: Dataframe
+    """
+    
+    # 1. Remover os espaços das string
+    colunas = ['ID', 'Delivery_person_ID', 'Delivery_person_Age', 'Delivery_person_Ratings', 'Order_Date', 'Time_Orderd', 'Time_Order_picked', 'Weatherconditions', 'Road_traffic_density', 'Type_of_order', 'Type_of_vehicle', 'multiple_deliveries', 'Festival', 'City', 'Time_taken(min)']
+
+    for coluna in colunas:
+      df.loc[:, coluna] = df.loc[:, coluna].str.strip("(min) ")
+
+    # 2. Excluir as linhas vazias
+    for colum in colunas:
+      df = df.loc[df[colum] != 'NaN', :]
+
+    # 3. Conversões de tipos dados
+    df['Delivery_person_Age'] = df['Delivery_person_Age'].astype(int)
+    df['Delivery_person_Ratings'] = df['Delivery_person_Ratings'].astype(float)
+    df['Order_Date'] = pd.to_datetime(df['Order_Date'], format='%d-%m-%Y')
+    df['Vehicle_condition'] = df['Vehicle_condition'].astype(int)
+    df['multiple_deliveries'] = df['multiple_deliveries'].astype(int)
+    df['Time_taken(min)'] = df['Time_taken(min)'].astype(int)
+
+    # 4. Redefinir o índice do DataFrame
+    df = df.reset_index(drop=True)
+    
+    return df
+
+
+def replicar_csv(origem, fator, destino):
+    
+    """ Grava em destino o CSV de origem repetido fator vezes """
+    
+    with open(origem, encoding='utf-8') as entrada:
+        cabecalho = entrada.readline()
+        corpo = entrada.read()
+    
+    if not corpo.endswith('\n'):
+        corpo += '\n'
+    
+    with open(destino, 'w', encoding='utf-8') as saida:
+        saida.write(cabecalho)
+        for _ in range(fator):
+            saida.write(corpo)
+
+
+def medir(funcao, *args):
+    
+    """ Executa funcao(*args) medindo tempo de parede e pico de memória
+        
+        O tempo é medido em uma execução sem o tracemalloc, que deixa as
+        alocações bem mais lentas; o pico vem de uma segunda execução.
+        
+        Output: (resultado, segundos, pico em MB)
+    """
+    
+    inicio = time.perf_counter()
+    resultado = funcao(*args)
+    segundos = time.perf_counter() - inicio
+    
+    tracemalloc.start()
+    funcao(*args)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    
+    return resultado, segundos, pico / 2**20
+
+
+def carregar_original(caminho):
+    return clean_code_original(pd.read_csv(caminho))
+
+
+def carregar_vetorizado(caminho):
+    return clean_code(read_dataset(caminho))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark do clean_code original x vetorizado')
+    parser.add_argument('--csv', default='dataset/train.csv')
+    parser.add_argument('--fatores', type=int, nargs='+', default=[10, 100])
+    args = parser.parse_args()
+    
+    print(f"{'fator':>6} {'linhas':>10} {'implementacao':>14} {'tempo (s)':>10} {'pico (MB)':>10}")
+    
+    with tempfile.TemporaryDirectory() as pasta:
+        for fator in args.fatores:
+            caminho = os.path.join(pasta, f'train_x{fator}.csv')
+            replicar_csv(args.csv, fator, caminho)
+            
+            df_original, tempo_original, pico_original = medir(carregar_original, caminho)
+            df_vetorizado, tempo_vetorizado, pico_vetorizado = medir(carregar_vetorizado, caminho)
+            
+            # As duas limpezas precisam produzir o mesmo DataFrame
+            pd.testing.assert_frame_equal(df_original, df_vetorizado)
+            
+            linhas = len(df_vetorizado)
+            print(f"{fator:>6} {linhas:>10} {'original':>14} {tempo_original:>10.3f} {pico_original:>10.1f}")
+            print(f"{fator:>6} {linhas:>10} {'vetorizado':>14} {tempo_vetorizado:>10.3f} {pico_vetorizado:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
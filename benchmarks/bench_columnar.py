@@ -0,0 +1,75 @@
+# ==========================
+# Benchmark da partida a frio com o arquivo colunar
+#
+# Mede o tempo e a memória residente (utils.profiling.memory_mb) acrescentada
+# pela carga do dataset limpo em três caminhos: leitura e limpeza do CSV,
+# Feather lido por memory-map e copiado inteiro para o pandas (to_pandas()
+# padrão), e o read_columnar de utils.data_loader, em que as colunas
+# numéricas continuam nas páginas do arquivo. Cada caminho roda em um
+# interpretador novo; depois da carga todas as colunas numéricas são somadas,
+# para que as páginas do memory-map sejam de fato lidas, como nos painéis.
+#
+# Uso:
+#   python -m benchmarks.bench_columnar --csv dataset/train.csv --repeticoes 3
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+from utils.data_loader import build_columnar_cache, columnar_path
+
+# Executado no interpretador novo: carga pelo caminho pedido e medições
+_MEDIDOR = '''
+import json, sys, time
+import pyarrow.feather as feather
+from utils.data_loader import prepare_data, read_columnar, read_dataset
+from utils.profiling import memory_mb
+
+caminho, csv, colunar = sys.argv[1], sys.argv[2], sys.argv[3]
+memoria, inicio = memory_mb(), time.perf_counter()
+if caminho == 'csv':
+    df = prepare_data(read_dataset(csv))
+elif caminho == 'feather (cópia)':
+    df = feather.read_table(colunar, memory_map=True).to_pandas()
+else:
+    df = read_columnar(colunar)
+segundos = time.perf_counter() - inicio
+df.select_dtypes('number').sum()
+print(json.dumps({'segundos': segundos, 'mb': memory_mb() - memoria, 'linhas': len(df)}))
+'''
+
+CAMINHOS = ['csv', 'feather (cópia)', 'feather (memory-map)']
+
+
+def medir(caminho, csv, colunar, repeticoes):
+    
+    """ Medianas de tempo e memória de um caminho de carga """
+    
+    medidas = []
+    for _ in range(repeticoes):
+        saida = subprocess.run([sys.executable, '-c', _MEDIDOR, caminho, csv, colunar], capture_output=True, text=True, check=True)
+        medidas.append(json.loads(saida.stdout))
+    
+    return statistics.median(m['segundos'] for m in medidas), statistics.median(m['mb'] for m in medidas), medidas[0]['linhas']
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Carga do dataset limpo: CSV x Feather copiado x Feather por memory-map')
+    parser.add_argument('--csv', default='dataset/train.csv')
+    parser.add_argument('--repeticoes', type=int, default=3)
+    args = parser.parse_args()
+    
+    colunar = columnar_path(args.csv)
+    build_columnar_cache(args.csv)
+    
+    print(f"{'caminho':>22} {'carga (s)':>10} {'memória (MB)':>13} {'linhas':>9}")
+    
+    for caminho in CAMINHOS:
+        segundos, mb, linhas = medir(caminho, args.csv, colunar, args.repeticoes)
+        print(f"{caminho:>22} {segundos:>10.3f} {mb:>13.1f} {linhas:>9}")
+
+
+if __name__ == '__main__':
+    main()
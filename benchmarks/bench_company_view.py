@@ -0,0 +1,110 @@
+# ==========================
+# Benchmark dos reruns da visão empresa
+#
+# Reproduz uma sequência de interações com a página 1 (trocar de aba, mudar
+# a data limite, mudar o trânsito) sem o Streamlit e mede o tempo de cada
+# rerun em dois modos:
+#   todas as abas: o comportamento de st.tabs, que filtra e desenha as três
+#                  abas (inclusive o mapa) a cada rerun, sem cache de figuras
+#   sob demanda:   só a aba aberta é calculada, com as figuras no cache até
+#                  os filtros mudarem
+# Em ambos os modos as figuras exibidas são serializadas para JSON, como o
+# st.plotly_chart faz a cada rerun.
+#
+# Uso:
+#   python -m benchmarks.bench_company_view --csv dataset/train.csv
+
+import argparse
+import time
+
+import folium as fl
+import pandas as pd
+
+from utils.backends import PandasBackend
+from utils.company_view import (ABAS, geographic_html, management_figures, order_by_week, order_metric,
+                                order_share_by_week, tactical_figures, traffic_order_city, traffic_order_share)
+from utils.data_loader import file_signature, prepare_data, read_dataset
+from utils.figure_cache import clear_figure_cache, figure_cache_info, filter_key
+from utils.distinct import build_courier_sketches
+from utils.filters import build_filter_index
+from utils.maps import build_map
+from utils.rollup import build_rollup
+
+TODAS = ['Low', 'Medium', 'High', 'Jam']
+
+# (descrição, data limite, trânsito, aba aberta)
+INTERACOES = [
+    ('abre a página', pd.Timestamp(2022, 4, 13), TODAS, 0),
+    ('abre Visão Tática', pd.Timestamp(2022, 4, 13), TODAS, 1),
+    ('abre Visão Geográfica', pd.Timestamp(2022, 4, 13), TODAS, 2),
+    ('volta à Gerencial', pd.Timestamp(2022, 4, 13), TODAS, 0),
+    ('muda a data limite', pd.Timestamp(2022, 3, 20), TODAS, 0),
+    ('abre Visão Tática', pd.Timestamp(2022, 3, 20), TODAS, 1),
+    ('remove Jam', pd.Timestamp(2022, 3, 20), ['Low', 'Medium', 'High'], 1),
+    ('abre Visão Geográfica', pd.Timestamp(2022, 3, 20), ['Low', 'Medium', 'High'], 2),
+    ('volta à Tática', pd.Timestamp(2022, 3, 20), ['Low', 'Medium', 'High'], 1),
+]
+
+
+def _exibir(figuras):
+    for figura in figuras:
+        figura.to_json()
+
+
+def rerun_todas_abas(fonte, data_limite, transito):
+    filtros = (data_limite, transito)
+    
+    _exibir([order_metric(fonte, *filtros), traffic_order_share(fonte, *filtros), traffic_order_city(fonte, *filtros)])
+    _exibir([order_by_week(fonte, *filtros), order_share_by_week(fonte, *filtros)])
+    figura = fl.Figure(width=1024, height=600)
+    figura.add_child(build_map(fonte.map_points(*filtros), 'medianas'))
+    figura.render()
+
+
+def rerun_sob_demanda(fonte, data_limite, transito, aba, chave):
+    if aba == 2:
+        geographic_html(fonte, data_limite, transito, 'medianas', chave)
+        return
+    
+    if aba == 0:
+        figuras = management_figures(fonte, data_limite, transito, chave)
+    else:
+        figuras = tactical_figures(fonte, data_limite, transito, chave)
+    _exibir(figuras.values())
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Tempo por rerun da visão empresa, com e sem cálculo sob demanda')
+    parser.add_argument('--csv', default='dataset/train.csv')
+    args = parser.parse_args()
+    
+    df = prepare_data(read_dataset(args.csv))
+    indice = build_filter_index(df)
+    tabelas = {'pedidos': build_rollup(df)['pedidos'], 'esbocos': build_courier_sketches(df)}
+    versao = file_signature(args.csv)
+    
+    clear_figure_cache()
+    
+    print(f"{'interação':>24} {'aba':>18} {'todas as abas (ms)':>19} {'sob demanda (ms)':>17}")
+    
+    totais = [0.0, 0.0]
+    for descricao, data_limite, transito, aba in INTERACOES:
+        inicio = time.perf_counter()
+        # Uma fonte por rerun, como nas páginas
+        rerun_todas_abas(PandasBackend(df, indice, tabelas), data_limite, transito)
+        tempo_todas = 1000 * (time.perf_counter() - inicio)
+        
+        inicio = time.perf_counter()
+        rerun_sob_demanda(PandasBackend(df, indice, tabelas), data_limite, transito, aba, filter_key(versao, data_limite, transito))
+        tempo_demanda = 1000 * (time.perf_counter() - inicio)
+        
+        totais[0] += tempo_todas
+        totais[1] += tempo_demanda
+        print(f"{descricao:>24} {ABAS[aba]:>18} {tempo_todas:>19.2f} {tempo_demanda:>17.2f}")
+    
+    print(f"{'total':>24} {'':>18} {totais[0]:>19.2f} {totais[1]:>17.2f}")
+    print(f"cache de figuras: {figure_cache_info()}")
+
+
+if __name__ == '__main__':
+    main()
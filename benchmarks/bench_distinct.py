@@ -0,0 +1,66 @@
+# ==========================
+# Benchmark da contagem de entregadores distintos
+#
+# Compara o modo exato (nunique sobre as linhas filtradas) com os esboços
+# HyperLogLog de utils.distinct (filtro das partições e mescla dos
+# registradores), no total e por semana, e confere o erro relativo de cada
+# estimativa contra o limite documentado (3 desvios padrão).
+#
+# Uso:
+#   python -m benchmarks.bench_distinct --csv dataset/train.csv
+
+import argparse
+
+import pandas as pd
+
+from benchmarks.bench_filters import CENARIOS, cronometrar
+from utils.data_loader import prepare_data, read_dataset
+from utils.distinct import build_courier_sketches, distinct_couriers, exact_couriers, relative_error
+from utils.filters import apply_filters, build_filter_index, filter_table
+
+
+def exato(df, indice, date_cutoff, traffic_options, chaves):
+    return exact_couriers(apply_filters(df, indice, date_cutoff, traffic_options), chaves)
+
+
+def estimado(esbocos, date_cutoff, traffic_options, chaves):
+    return distinct_couriers(filter_table(esbocos, date_cutoff, traffic_options), chaves)
+
+
+def erro_maximo(esperado, obtido):
+    
+    """ Maior erro relativo entre as contagens exata e estimada """
+    
+    if not isinstance(esperado, pd.DataFrame):
+        return abs(obtido / esperado - 1) if esperado else 0.0
+    
+    juntos = esperado.merge(obtido, on=list(esperado.columns[:-1]), suffixes=('_exato', '_estimado'))
+    
+    return (juntos['Delivery_person_ID_estimado'] / juntos['Delivery_person_ID_exato'] - 1).abs().max()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Contagem exata x HyperLogLog de entregadores distintos')
+    parser.add_argument('--csv', default='dataset/train.csv')
+    args = parser.parse_args()
+    
+    df = prepare_data(read_dataset(args.csv))
+    indice = build_filter_index(df)
+    esbocos = build_courier_sketches(df)
+    limite = 3 * relative_error()
+    
+    print(f"{'cenario':>20} {'agrupamento':>12} {'exato (ms)':>11} {'esboços (ms)':>13} {'erro max':>9}")
+    
+    for nome, data_limite, transito in CENARIOS:
+        for chaves in [None, ['week_of_year']]:
+            esperado, tempo_exato = cronometrar(exato, df, indice, data_limite, transito, chaves)
+            obtido, tempo_esbocos = cronometrar(estimado, esbocos, data_limite, transito, chaves)
+            
+            erro = erro_maximo(esperado, obtido)
+            assert erro <= limite, f'erro {erro:.4f} acima do limite {limite:.4f}'
+            
+            print(f"{nome:>20} {'semana' if chaves else 'total':>12} {tempo_exato:>11.2f} {tempo_esbocos:>13.2f} {erro:>9.2%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+# ==========================
+# Benchmark dos filtros da barra lateral
+#
+# Compara as máscaras booleanas originais (Order_Date < data limite seguido de
+# isin no trânsito) com apply_filters (busca binária na data ordenada e
+# máscaras de trânsito pré-calculadas), sobre o dataset replicado até o
+# número de linhas pedido.
+#
+# Uso:
+#   python -m benchmarks.bench_filters --csv dataset/train.csv --linhas 1000000 5000000
+
+import argparse
+import time
+
+import pandas as pd
+
+from utils.data_loader import prepare_data, read_dataset
+from utils.filters import apply_filters, build_filter_index
+
+CENARIOS = [
+    ('todas as condições', pd.Timestamp(2022, 3, 20), ['Low', 'Medium', 'High', 'Jam']),
+    ('duas condições', pd.Timestamp(2022, 3, 20), ['High', 'Jam']),
+    ('data máxima', pd.Timestamp(2022, 4, 13), ['Low', 'Medium', 'High', 'Jam']),
+]
+
+
+def filtro_original(df, date_cutoff, traffic_options):
+    df = df.loc[df['Order_Date'] < date_cutoff, :]
+    df = df.loc[df['Road_traffic_density'].isin(traffic_options), :]
+    
+    return df
+
+
+def cronometrar(funcao, *args, repeticoes=5):
+    
+    """ Menor tempo (em ms) entre algumas execuções de funcao(*args) """
+    
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao(*args)
+        tempos.append(time.perf_counter() - inicio)
+    
+    return resultado, 1000 * min(tempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark dos filtros de data e trânsito')
+    parser.add_argument('--csv', default='dataset/train.csv')
+    parser.add_argument('--linhas', type=int, nargs='+', default=[1_000_000])
+    args = parser.parse_args()
+    
+    base = prepare_data(read_dataset(args.csv))
+    
+    print(f"{'linhas':>10} {'cenario':>20} {'mascaras (ms)':>14} {'indice (ms)':>12}")
+    
+    for linhas in args.linhas:
+        copias = -(-linhas // len(base))
+        df = pd.concat([base] * copias, ignore_index=True).iloc[:linhas]
+        df = df.sort_values('Order_Date', kind='stable', ignore_index=True)
+        indice = build_filter_index(df)
+        
+        # Todas as categorias presentes nos dados: o filtro vira só o corte por data
+        cenarios = CENARIOS + [('todas as categorias', pd.Timestamp(2022, 3, 20), list(indice['transito']))]
+        
+        for nome, data_limite, transito in cenarios:
+            esperado, tempo_original = cronometrar(filtro_original, df, data_limite, transito)
+            obtido, tempo_indice = cronometrar(apply_filters, df, indice, data_limite, transito)
+            
+            pd.testing.assert_frame_equal(esperado, obtido)
+            
+            print(f"{linhas:>10} {nome:>20} {tempo_original:>14.2f} {tempo_indice:>12.2f}")
+
+
+if __name__ == '__main__':
+    main()
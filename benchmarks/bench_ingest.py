@@ -0,0 +1,123 @@
+# ==========================
+# Benchmark e conferência da ingestão incremental
+#
+# Separa o fim do CSV em lotes e os acrescenta, um a um, com a linha de
+# comando de utils.ingest rodando em outro processo (como em produção). Depois
+# de cada lote, o load_data do processo do benchmark, que já tinha o
+# histórico em cache, precisa ler só as linhas novas. A última carga parte
+# do cache vazio e usa o arquivo colunar gravado antes do último lote. Cada
+# resultado é comparado com uma releitura completa do CSV (prepare_data),
+# inclusive os artefatos mescláveis das páginas, e os tempos são mostrados
+# lado a lado.
+#
+# Uso:
+#   python -m benchmarks.bench_ingest --csv dataset/train.csv --lotes 3 --fracao 0.1
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from utils import data_loader
+from utils.data_loader import load_data, load_derived, prepare_data, read_dataset
+from utils.rollup import orders_by
+from utils.stats import summarize
+from utils.warmup import ARTEFATOS
+
+
+def separar_lotes(csv, destino, lotes, fracao):
+    
+    """ Grava o histórico e os lotes (o fim do CSV) em arquivos separados
+        
+        Output: (caminho do histórico, lista de caminhos dos lotes)
+    """
+    
+    with open(csv, encoding='utf-8') as arquivo:
+        cabecalho = arquivo.readline()
+        linhas = arquivo.readlines()
+    
+    corte = len(linhas) - int(len(linhas) * fracao)
+    tamanho = -(-(len(linhas) - corte) // lotes)
+    
+    historico = os.path.join(destino, 'train.csv')
+    with open(historico, 'w', encoding='utf-8') as arquivo:
+        arquivo.write(cabecalho)
+        arquivo.writelines(linhas[:corte])
+    
+    caminhos = []
+    for numero, inicio in enumerate(range(corte, len(linhas), tamanho)):
+        caminho = os.path.join(destino, f'lote_{numero}.csv')
+        with open(caminho, 'w', encoding='utf-8') as arquivo:
+            arquivo.write(cabecalho)
+            arquivo.writelines(linhas[inicio:inicio + tamanho])
+        caminhos.append(caminho)
+    
+    return historico, caminhos
+
+
+def conferir(path, df):
+    
+    """ O DataFrame e os artefatos em cache iguais aos de uma releitura completa
+        
+        Output: segundos da releitura completa
+    """
+    
+    inicio = time.perf_counter()
+    completo = prepare_data(read_dataset(path))
+    segundos = time.perf_counter() - inicio
+    
+    pd.testing.assert_frame_equal(df, completo)
+    
+    funcao, mescla = ARTEFATOS['rollup_empresa']
+    rollup, esperado = load_derived('rollup_empresa', funcao, path, mescla), funcao(completo)
+    pd.testing.assert_frame_equal(orders_by(rollup, ['Order_Date', 'City']), orders_by(esperado, ['Order_Date', 'City']))
+    
+    funcao, mescla = ARTEFATOS['estatisticas_paineis']
+    estatisticas, esperado = load_derived('estatisticas_paineis', funcao, path, mescla), funcao(completo)
+    pd.testing.assert_frame_equal(summarize(estatisticas['tempo'], ['City']), summarize(esperado['tempo'], ['City']), rtol=1e-9)
+    
+    return segundos
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Ingestão de lotes por outro processo x releitura completa do CSV')
+    parser.add_argument('--csv', default='dataset/train.csv')
+    parser.add_argument('--lotes', type=int, default=3)
+    parser.add_argument('--fracao', type=float, default=0.1, help='fração final do CSV separada em lotes')
+    args = parser.parse_args()
+    
+    destino = tempfile.mkdtemp(prefix='bench_ingest_')
+    try:
+        historico, lotes = separar_lotes(args.csv, destino, args.lotes, args.fracao)
+        
+        load_data(historico)
+        for nome, (funcao, mescla) in ARTEFATOS.items():
+            load_derived(nome, funcao, historico, mescla)
+        
+        print(f"{'etapa':>24} {'incremental (s)':>16} {'completa (s)':>13} {'linhas':>9}")
+        
+        for numero, lote in enumerate(lotes):
+            if numero == len(lotes) - 1:
+                # Partida a frio: cache vazio e arquivo colunar da versão anterior
+                data_loader.clear_cache()
+            
+            subprocess.run([sys.executable, '-m', 'utils.ingest', lote, '--csv', historico], check=True, capture_output=True)
+            
+            inicio = time.perf_counter()
+            df = load_data(historico)
+            segundos = time.perf_counter() - inicio
+            
+            completa = conferir(historico, df)
+            etapa = f'lote {numero} (a frio)' if numero == len(lotes) - 1 else f'lote {numero}'
+            print(f"{etapa:>24} {segundos:>16.3f} {completa:>13.3f} {len(df):>9}")
+    finally:
+        shutil.rmtree(destino)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+# ==========================
+# Benchmark e conferência do índice espacial
+#
+# Compara as consultas de utils.spatial com a varredura de todas as linhas
+# filtradas: densidade e tempo médio por célula contra um groupby sobre as
+# células calculadas na hora, e "entregas a até R km de um restaurante"
+# contra o haversine aplicado a todas as entregas. Os resultados precisam
+# ser iguais; mostra o tempo de cada caminho por rerun. Antes, faz a mesma
+# conferência com entregas sintéticas em volta de cidades dos quatro
+# quadrantes (latitudes e longitudes negativas, e o meridiano de Greenwich
+# atravessado), que o dataset, todo na Índia, não cobre.
+#
+# Uso:
+#   python -m benchmarks.bench_spatial --csv dataset/train.csv --raios 1 3 10
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_filters import CENARIOS, cronometrar
+from utils.data_loader import prepare_data, read_dataset
+from utils.filters import apply_filters, build_filter_index
+from utils.geo import haversine_km
+from utils.spatial import CELULA_GRAUS, build_spatial_index, grid_stats, orders_within
+
+
+def grade_varredura(df, indice, date_cutoff, traffic_options):
+    
+    """ Células calculadas na hora e groupby sobre as linhas filtradas """
+    
+    filtrado = apply_filters(df, indice, date_cutoff, traffic_options)
+    linha = np.floor(filtrado['Delivery_location_latitude'].to_numpy() / CELULA_GRAUS)
+    coluna = np.floor(filtrado['Delivery_location_longitude'].to_numpy() / CELULA_GRAUS)
+    
+    return filtrado['Time_taken(min)'].groupby([linha, coluna]).agg(['size', 'mean'])
+
+
+def raio_varredura(df, indice, latitude, longitude, raio_km, date_cutoff, traffic_options):
+    
+    """ Haversine sobre todas as linhas filtradas """
+    
+    filtrado = apply_filters(df, indice, date_cutoff, traffic_options)
+    distancias = haversine_km(latitude, longitude, filtrado['Delivery_location_latitude'], filtrado['Delivery_location_longitude'])
+    
+    return filtrado.loc[distancias <= raio_km, :]
+
+
+# Cidades dos quatro quadrantes: Nova York, Buenos Aires, Londres e Sydney
+PONTOS_QUADRANTES = [(40.7128, -74.006), (-34.6037, -58.3816), (51.5074, -0.1278), (-33.8688, 151.2093)]
+
+
+def entregas_quadrantes(pontos=PONTOS_QUADRANTES, por_ponto=500, seed=0):
+    
+    """ Entregas sintéticas espalhadas (~5 km) em volta de cada ponto, com
+        as colunas usadas pelos índices, ordenadas por Order_Date """
+    
+    rng = np.random.default_rng(seed)
+    total = len(pontos) * por_ponto
+    centros = np.repeat(np.array(pontos), por_ponto, axis=0)
+    locais = centros + rng.normal(scale=0.05, size=(total, 2))
+    
+    df = pd.DataFrame({
+        'Delivery_location_latitude': locais[:, 0],
+        'Delivery_location_longitude': locais[:, 1],
+        'Restaurant_latitude': centros[:, 0],
+        'Restaurant_longitude': centros[:, 1],
+        'Order_Date': pd.Timestamp(2022, 3, 1) + pd.to_timedelta(rng.integers(0, 40, total), unit='D'),
+        'Road_traffic_density': pd.Categorical(rng.choice(['Low', 'Medium', 'High', 'Jam'], total)),
+        'Time_taken(min)': rng.integers(10, 55, total),
+    })
+    
+    return df.sort_values('Order_Date', kind='stable', ignore_index=True)
+
+
+def conferir_quadrantes(raios):
+    
+    """ Grade e raio do índice iguais aos da varredura nas entregas sintéticas
+        dos quatro quadrantes, com cada consulta centrada em uma das cidades """
+    
+    df = entregas_quadrantes()
+    indice = build_filter_index(df)
+    espacial = build_spatial_index(df)
+    
+    encontradas = 0
+    for _, data_limite, transito in CENARIOS:
+        conferir_grade(grade_varredura(df, indice, data_limite, transito), grid_stats(df, espacial, indice, data_limite, transito))
+        
+        for latitude, longitude in PONTOS_QUADRANTES:
+            for raio in raios:
+                pontos = (latitude, longitude, raio, data_limite, transito)
+                obtido = orders_within(df, espacial, indice, *pontos)
+                assert obtido.index.equals(raio_varredura(df, indice, *pontos).index)
+                encontradas += len(obtido)
+    
+    # Comparação não vazia: os raios pegam entregas em volta das cidades
+    assert encontradas > 0
+
+
+def conferir_grade(esperado, obtido):
+    
+    """ Mesmas células, quantidades e médias nos dois caminhos """
+    
+    celulas = pd.MultiIndex.from_arrays([np.floor(obtido['latitude'] / CELULA_GRAUS), np.floor(obtido['longitude'] / CELULA_GRAUS)])
+    obtido = obtido.set_axis(celulas).loc[esperado.index]
+    
+    assert len(obtido) == len(esperado)
+    np.testing.assert_array_equal(obtido['pedidos'], esperado['size'])
+    np.testing.assert_allclose(obtido['avg_time'], esperado['mean'], rtol=1e-9)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Consultas espaciais com índice em grade x varredura')
+    parser.add_argument('--csv', default='dataset/train.csv')
+    parser.add_argument('--raios', type=float, nargs='+', default=[1, 3, 10])
+    args = parser.parse_args()
+    
+    conferir_quadrantes(args.raios)
+    print(f'quadrantes: grade e raio iguais à varredura em {len(PONTOS_QUADRANTES)} cidades')
+    
+    df = prepare_data(read_dataset(args.csv))
+    indice = build_filter_index(df)
+    espacial = build_spatial_index(df)
+    restaurante = espacial['restaurantes'].iloc[0]
+    
+    print(f"{'cenario':>20} {'consulta':>20} {'varredura (ms)':>15} {'indice (ms)':>12} {'linhas':>8}")
+    
+    for nome, data_limite, transito in CENARIOS:
+        esperado, tempo_varredura = cronometrar(grade_varredura, df, indice, data_limite, transito)
+        obtido, tempo_indice = cronometrar(grid_stats, df, espacial, indice, data_limite, transito)
+        conferir_grade(esperado, obtido)
+        print(f"{nome:>20} {'grade':>20} {tempo_varredura:>15.2f} {tempo_indice:>12.2f} {len(obtido):>8}")
+        
+        for raio in args.raios:
+            pontos = (restaurante['Restaurant_latitude'], restaurante['Restaurant_longitude'], raio, data_limite, transito)
+            esperado, tempo_varredura = cronometrar(raio_varredura, df, indice, *pontos)
+            obtido, tempo_indice = cronometrar(orders_within, df, espacial, indice, *pontos)
+            assert obtido.index.equals(esperado.index)
+            print(f"{nome:>20} {f'raio {raio:g} km':>20} {tempo_varredura:>15.2f} {tempo_indice:>12.2f} {len(obtido):>8}")
+
+
+if __name__ == '__main__':
+    main()
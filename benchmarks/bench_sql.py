@@ -0,0 +1,189 @@
+# ==========================
+# Benchmark e conferência do backend SQL
+#
+# Para cada painel, compara o resultado das duas fontes das páginas
+# (utils.backends): consultas ao SQLite (utils.sql_backend) e o caminho em
+# pandas (DataFrame e tabelas pré-agregadas do cache, filtrados por
+# utils.filters), e mostra o tempo de cada fonte por rerun. Entregadores
+# distintos são contados de forma exata nas duas
+# (utils.distinct.exact_couriers no pandas). Além dos cenários de
+# benchmarks.bench_filters, confere filtros que não deixam nenhuma linha
+# (nenhuma condição de trânsito; a data mínima, já que o limite é exclusivo)
+# e um CSV de uma única linha, em que todo grupo tem um valor (desvio NaN).
+#
+# Uso:
+#   python -m benchmarks.bench_sql --csv dataset/train.csv
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+import pandas as pd
+
+from benchmarks.bench_filters import CENARIOS, cronometrar
+from utils.backends import pandas_backend
+from utils.data_loader import prepare_data, read_dataset
+from utils.sql_backend import SqlBackend
+
+TRANSITO = ['Low', 'Medium', 'High', 'Jam']
+
+# Filtros sem nenhuma linha: os painéis ficam vazios (ou NaN) nas duas fontes
+CENARIOS_VAZIOS = [
+    ('sem condições', pd.Timestamp(2022, 4, 13), []),
+    ('data mínima', pd.Timestamp(2022, 2, 11), TRANSITO),
+]
+
+
+def _paineis(fonte, date_cutoff, traffic_options):
+    
+    """ Resultado de cada painel pedido à fonte (utils.backends) """
+    
+    argumentos = (date_cutoff, traffic_options)
+    restaurante = fonte.restaurants().iloc[0]
+    ponto = (restaurante['Restaurant_latitude'], restaurante['Restaurant_longitude'], 3)
+    
+    return {
+        'order_metric': fonte.order_metric(*argumentos),
+        'order_by_week': fonte.order_by_week(*argumentos),
+        'traffic_order_city': fonte.traffic_order_city(*argumentos),
+        'traffic_order_share': fonte.traffic_order_share(*argumentos),
+        'order_share_by_week': fonte.order_share_by_week(*argumentos),
+        'courier_extremes': fonte.courier_extremes(*argumentos),
+        'avg_ratings_per_deliver': fonte.avg_ratings_per_deliver(*argumentos),
+        'ratings_by_traffic': fonte.ratings_by('Road_traffic_density', *argumentos),
+        'ratings_by_weather': fonte.ratings_by('Weatherconditions', *argumentos),
+        'top_delivers': fonte.top_delivers(*argumentos),
+        'delivery_unique': fonte.delivery_unique(*argumentos),
+        'distance': fonte.distance(*argumentos),
+        'distance_by_city': fonte.distance(*argumentos, figura=True),
+        'festival_time': fonte.festival_time(*argumentos),
+        'avg_std_time_graph': fonte.avg_std_time_graph(*argumentos),
+        'avg_std_time_on_traffic': fonte.avg_std_time_on_traffic(*argumentos),
+        'time_by_city_and_order': fonte.time_by_city_and_order(*argumentos),
+        'prep_time_by_city': fonte.prep_time_by('City', *argumentos),
+        'prep_time_by_hour': fonte.prep_time_by('order_hour', *argumentos),
+        'restaurants': fonte.restaurants(),
+        'grid_stats': fonte.grid_stats(*argumentos),
+        'orders_within': fonte.orders_within(*ponto, *argumentos).loc[:, ['Time_taken(min)', 'distancia_ponto']],
+        'map_points': fonte.map_points(*argumentos).reset_index(drop=True),
+    }
+
+
+def _paineis_pandas(csv, date_cutoff, traffic_options):
+    
+    """ Painéis pela fonte em pandas, montada como em um rerun das páginas
+        (tabelas filtradas de novo), com a contagem exata de entregadores
+        distintos, como o COUNT DISTINCT do banco """
+    
+    return _paineis(pandas_backend(csv, exato=True), date_cutoff, traffic_options)
+
+
+def _normalizar(resultado):
+    
+    """ Tira categorias e índice para comparar com o resultado do SQLite
+        
+        Tabelas agrupadas são ordenadas pelas chaves: com mais de uma chave
+        categórica o groupby do pandas ordena os grupos pela primeira
+        aparição, enquanto o SQL ordena pelo texto.
+    """
+    
+    if isinstance(resultado, tuple):
+        return tuple(_normalizar(parte) for parte in resultado)
+    
+    if isinstance(resultado, pd.Series):
+        return resultado.astype('float64')
+    
+    if not isinstance(resultado, pd.DataFrame):
+        return resultado
+    
+    # astype em vez de apply, que não percorre as colunas de tabelas vazias
+    resultado = resultado.astype({coluna: object for coluna in resultado.columns if isinstance(resultado[coluna].dtype, pd.CategoricalDtype)})
+    chaves = [coluna for coluna in resultado.columns if resultado[coluna].dtype == object]
+    if chaves:
+        resultado = resultado.sort_values(chaves, kind='stable')
+    
+    # Sem linhas, o merge do pandas muda a ordem das colunas
+    if resultado.empty:
+        resultado = resultado.loc[:, sorted(resultado.columns)]
+    
+    return resultado.reset_index(drop=True)
+
+
+def conferir(esperado, obtido):
+    
+    """ Compara painel a painel; valores de ponto flutuante com tolerância
+        relativa de 1e-6 (as avaliações são float32 no DataFrame) """
+    
+    for nome in esperado:
+        a, b = _normalizar(esperado[nome]), _normalizar(obtido[nome])
+        
+        if isinstance(a, tuple):
+            for parte_a, parte_b in zip(a, b):
+                pd.testing.assert_frame_equal(parte_a, parte_b, check_dtype=False, rtol=1e-6, obj=nome)
+        elif isinstance(a, pd.DataFrame):
+            pd.testing.assert_frame_equal(a, b, check_dtype=False, rtol=1e-6, obj=nome)
+        elif isinstance(a, pd.Series):
+            pd.testing.assert_series_equal(a, b, check_dtype=False, check_names=False, obj=nome)
+        else:
+            assert a == b or (pd.isna(a) and pd.isna(b)), f'{nome}: {a} != {b}'
+
+
+def conferir_linha_unica(csv):
+    
+    """ Painéis das duas fontes iguais em um CSV com uma única linha válida,
+        em que todos os grupos têm um valor """
+    
+    with open(csv, encoding='utf-8') as arquivo:
+        cabecalho = arquivo.readline()
+        linhas = arquivo.readlines()
+    
+    destino = tempfile.mkdtemp(prefix='bench_sql_')
+    try:
+        unica = os.path.join(destino, 'train.csv')
+        for linha in linhas:
+            with open(unica, 'w', encoding='utf-8') as arquivo:
+                arquivo.write(cabecalho + linha)
+            
+            # Primeira linha que sobra depois da limpeza do dataset
+            if len(prepare_data(read_dataset(unica))) == 1:
+                break
+        
+        conferir(_paineis_pandas(unica, pd.Timestamp(2022, 4, 13), TRANSITO), _paineis(SqlBackend(unica), pd.Timestamp(2022, 4, 13), TRANSITO))
+    finally:
+        shutil.rmtree(destino)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Painéis em pandas x consultas no SQLite')
+    parser.add_argument('--csv', default='dataset/train.csv')
+    args = parser.parse_args()
+    
+    inicio = time.perf_counter()
+    backend = SqlBackend(args.csv)
+    print(f'banco: {backend.banco} ({time.perf_counter() - inicio:.1f} s)')
+    
+    # Carga do DataFrame e dos artefatos no cache, fora das medições
+    pandas_backend(args.csv)
+    
+    print(f"{'cenario':>20} {'pandas (ms)':>12} {'sql (ms)':>9}")
+    
+    for nome, data_limite, transito in CENARIOS:
+        esperado, tempo_pandas = cronometrar(_paineis_pandas, args.csv, data_limite, transito, repeticoes=3)
+        obtido, tempo_sql = cronometrar(_paineis, backend, data_limite, transito, repeticoes=3)
+        
+        conferir(esperado, obtido)
+        
+        print(f"{nome:>20} {tempo_pandas:>12.2f} {tempo_sql:>9.2f}")
+    
+    for nome, data_limite, transito in CENARIOS_VAZIOS:
+        conferir(_paineis_pandas(args.csv, data_limite, transito), _paineis(backend, data_limite, transito))
+        print(f'{nome}: painéis vazios iguais nas duas fontes')
+    
+    conferir_linha_unica(args.csv)
+    print('linha única: painéis iguais nas duas fontes')
+
+
+if __name__ == '__main__':
+    main()
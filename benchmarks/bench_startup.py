@@ -0,0 +1,123 @@
+# ==========================
+# Benchmark da partida e do rerun dos scripts das páginas
+#
+# Na primeira execução de uma página em um processo, o Streamlit paga as
+# importações do topo do script e a carga dos dados; nos reruns seguintes
+# os módulos já estão em sys.modules e os dados no cache do processo. Este
+# benchmark executa o script de cada página duas vezes no mesmo
+# interpretador (novo a cada repetição), como o Streamlit faz a cada
+# interação, e mostra a mediana do tempo da primeira execução e do rerun.
+# Fora do `streamlit run` as páginas rodam no modo "bare" do Streamlit: os
+# widgets devolvem o valor padrão e nada é enviado a um navegador, então o
+# tempo é o do script (carga, filtros, consultas e figuras).
+#
+# Precisa do streamlit instalado e do dataset em <raiz>/dataset/train.csv
+# (o caminho usado pelas páginas). Uma página que falha aparece com a última
+# linha do erro no lugar dos tempos. A fonte dos painéis segue a variável
+# CURRY_BACKEND do ambiente (utils.backends).
+#
+# Com --logo mede também o custo por rerun do logo da barra lateral: abrir e
+# reduzir a imagem (o que o st.image fazia com a imagem do PIL a cada rerun)
+# contra os bytes em cache de utils.sidebar.
+#
+# Uso:
+#   python -m benchmarks.bench_startup --repeticoes 5
+#   CURRY_BACKEND=sql python -m benchmarks.bench_startup
+#   python -m benchmarks.bench_startup --raiz /caminho/de/outra/versao
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+PAGINAS = ['Home.py', 'pages/1_visao_empresa.py', 'pages/2_visao_entregadores.py', 'pages/3_visao_restaurantes.py']
+
+# Executado no interpretador novo: roda o script da página duas vezes e
+# devolve o tempo de cada execução
+_MEDIDOR = '''
+import json, runpy, sys, time
+tempos = []
+for _ in range(2):
+    inicio = time.perf_counter()
+    runpy.run_path(sys.argv[1], run_name='__main__')
+    tempos.append(time.perf_counter() - inicio)
+print(json.dumps(tempos))
+'''
+
+
+def medir_pagina(raiz, pagina, repeticoes):
+    
+    """ Medianas da primeira execução e do rerun da página
+        
+        Input: pasta do projeto, script da página e quantidade de
+               interpretadores novos
+        Output: (segundos da primeira execução, segundos do rerun), ou a
+                mensagem de erro se o script falhar
+    """
+    
+    medidas = []
+    for _ in range(repeticoes):
+        saida = subprocess.run([sys.executable, '-c', _MEDIDOR, pagina], cwd=raiz, capture_output=True, text=True)
+        if saida.returncode != 0:
+            linhas = saida.stderr.strip().splitlines()
+            return linhas[-1] if linhas else f'código de saída {saida.returncode}'
+        # Só a última linha: o script da página pode escrever na saída padrão
+        medidas.append(json.loads(saida.stdout.strip().splitlines()[-1]))
+    
+    return statistics.median(m[0] for m in medidas), statistics.median(m[1] for m in medidas)
+
+
+def medir_logo(repeticoes=20):
+    
+    """ Tempo por rerun do logo: imagem do PIL redimensionada x bytes em cache """
+    
+    import io
+    
+    from PIL import Image
+    
+    from utils.sidebar import LARGURA_LOGO, LOGO_PATH, logo_bytes
+    
+    def sem_cache():
+        imagem = Image.open(LOGO_PATH)
+        altura = round(imagem.height * LARGURA_LOGO / imagem.width)
+        imagem.resize((LARGURA_LOGO, altura), Image.Resampling.LANCZOS).save(io.BytesIO(), format='PNG')
+    
+    logo_bytes()
+    
+    resultados = {}
+    for nome, funcao in [('PIL a cada rerun', sem_cache), ('bytes em cache', logo_bytes)]:
+        inicio = time.perf_counter()
+        for _ in range(repeticoes):
+            funcao()
+        resultados[nome] = 1000 * (time.perf_counter() - inicio) / repeticoes
+    
+    return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Tempo da primeira execução e do rerun dos scripts das páginas')
+    parser.add_argument('--raiz', default='.', help='pasta do projeto (permite medir outra versão)')
+    parser.add_argument('--repeticoes', type=int, default=5)
+    parser.add_argument('--logo', action='store_true', help='mede também o logo por rerun (precisa do Pillow)')
+    args = parser.parse_args()
+    
+    print(f"{'pagina':>32} {'primeira execução (ms)':>23} {'rerun (ms)':>11}")
+    
+    for pagina in PAGINAS:
+        resultado = medir_pagina(args.raiz, pagina, args.repeticoes)
+        if isinstance(resultado, str):
+            print(f"{pagina:>32}  erro: {resultado}")
+            continue
+        
+        partida, rerun = resultado
+        print(f"{pagina:>32} {1000 * partida:>23.1f} {1000 * rerun:>11.1f}")
+    
+    if args.logo:
+        for nome, ms in medir_logo().items():
+            print(f"{'logo: ' + nome:>32} {ms:>17.3f}")
+
+
+if __name__ == '__main__':
+    main()
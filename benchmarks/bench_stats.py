@@ -0,0 +1,101 @@
+# ==========================
+# Benchmark e conferência das estatísticas mescláveis
+#
+# Para cada painel de média/desvio padrão, compara o resultado dos
+# acumuladores de utils.stats com o groupby().agg(['mean', 'std']) do pandas
+# sobre os pedidos filtrados, e confere que acumuladores calculados em blocos
+# e mesclados dão o mesmo resultado. Mostra o tempo de cada caminho por rerun.
+#
+# Uso:
+#   python -m benchmarks.bench_stats --csv dataset/train.csv --blocos 8
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.data_loader import prepare_data, read_dataset
+from utils.filters import apply_filters, build_filter_index, filter_tables
+from utils.stats import PAINEIS, build_panel_stats, merge_panel_stats, summarize
+
+# (acumulador, coluna medida, chaves do painel)
+CONSULTAS = [
+    ('tempo', 'Time_taken(min)', ['City', 'Road_traffic_density']),
+    ('tempo', 'Time_taken(min)', ['City']),
+    ('tempo', 'Time_taken(min)', ['Festival']),
+    ('tempo', 'Time_taken(min)', ['City', 'Type_of_order']),
+    ('avaliacao', 'Delivery_person_Ratings', ['Road_traffic_density']),
+    ('avaliacao', 'Delivery_person_Ratings', ['Weatherconditions']),
+    ('preparo', 'prep_minutes', ['City']),
+    ('preparo', 'prep_minutes', ['order_hour']),
+]
+
+DATA_LIMITE = pd.Timestamp(2022, 3, 20)
+
+
+def conferir(esperado, obtido, chaves):
+    
+    """ Compara as médias e desvios padrão com tolerância relativa de 1e-9
+        
+        As linhas dos acumuladores precisam vir ordenadas pelas chaves, como
+        nas tabelas e gráficos das páginas; só a referência é ordenada (com
+        chaves categóricas e observed=True o groupby do pandas pode devolver
+        os grupos na ordem de aparição).
+    """
+    
+    esperado = esperado.sort_values(chaves).reset_index(drop=True)
+    obtido = obtido.reset_index(drop=True)
+    
+    for chave in chaves:
+        assert (esperado[chave].astype(str) == obtido[chave].astype(str)).all(), chave
+    
+    np.testing.assert_allclose(esperado['avg_time'], obtido['avg_time'], rtol=1e-9)
+    np.testing.assert_allclose(esperado['std_time'], obtido['std_time'], rtol=1e-9)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Confere e mede as estatísticas mescláveis contra o pandas')
+    parser.add_argument('--csv', default='dataset/train.csv')
+    parser.add_argument('--blocos', type=int, default=8)
+    args = parser.parse_args()
+    
+    df = prepare_data(read_dataset(args.csv))
+    indice = build_filter_index(df)
+    transito = list(indice['transito'])
+    
+    estatisticas = build_panel_stats(df)
+    
+    # Os mesmos acumuladores calculados em blocos e mesclados
+    mescladas = None
+    for bloco in np.array_split(np.arange(len(df)), args.blocos):
+        parcial = build_panel_stats(df.iloc[bloco])
+        mescladas = parcial if mescladas is None else merge_panel_stats(mescladas, parcial)
+    
+    filtrado = apply_filters(df, indice, DATA_LIMITE, transito)
+    filtradas = filter_tables(estatisticas, DATA_LIMITE, transito)
+    mescladas = filter_tables(mescladas, DATA_LIMITE, transito)
+    
+    print(f"{'painel':>48} {'pandas (ms)':>12} {'acumulador (ms)':>16}")
+    
+    for nome, coluna, chaves in CONSULTAS:
+        inicio = time.perf_counter()
+        # Referência em float64: as avaliações ficam em float32 no DataFrame
+        esperado = filtrado[coluna].astype('float64').groupby([filtrado[chave] for chave in chaves], observed=True).agg(['mean', 'std']).reset_index()
+        tempo_pandas = 1000 * (time.perf_counter() - inicio)
+        esperado.columns = chaves + ['avg_time', 'std_time']
+        
+        inicio = time.perf_counter()
+        obtido = summarize(filtradas[nome], chaves)
+        tempo_acumulador = 1000 * (time.perf_counter() - inicio)
+        
+        conferir(esperado, obtido, chaves)
+        conferir(esperado, summarize(mescladas[nome], chaves), chaves)
+        
+        print(f"{coluna + ' x ' + '/'.join(chaves):>48} {tempo_pandas:>12.2f} {tempo_acumulador:>16.2f}")
+    
+    print(f"linhas: {len(filtrado)}; células dos acumuladores: " + ', '.join(f'{nome}={len(estatisticas[nome])}' for nome in PAINEIS))
+
+
+if __name__ == '__main__':
+    main()
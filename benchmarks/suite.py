@@ -0,0 +1,160 @@
+# ==========================
+# Suíte de benchmarks das computações do dashboard
+#
+# Mede, sem iniciar o Streamlit, o tempo e o pico de memória de cada
+# computação das páginas sobre CSVs sintéticos (benchmarks.synthetic) de
+# vários tamanhos, gravados em uma pasta temporária e lidos com o
+# read_dataset. Os cálculos de carga (limpeza, colunas derivadas, rollup e
+# acumuladores) e os de rerun (gráficos, ranking e mapas sobre os dados
+# filtrados) aparecem separados. O resultado sai como tabela e, com --json,
+# em um arquivo JSON com o commit medido, para comparar execuções.
+#
+# Com 10M de linhas o DataFrame cru ocupa alguns GB; inclua esse tamanho em
+# --linhas só em máquinas com memória para isso.
+#
+# Uso:
+#   python -m benchmarks.suite --linhas 10000 100000 1000000 --json resultados.json
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import tempfile
+
+import folium as fl
+import pandas as pd
+
+from benchmarks.bench_clean_code import medir
+from benchmarks.synthetic import write_synthetic_csv
+from utils.backends import PandasBackend
+from utils.company_view import order_share_by_week
+from utils.data_loader import clean_code, prepare_data, read_dataset
+from utils.distinct import build_courier_sketches
+from utils.filters import apply_filters, build_filter_index
+from utils.dates import add_order_timing
+from utils.geo import add_distance
+from utils.maps import MODOS, build_map
+from utils.metrics import build_courier_extremes
+from utils.ranking import rank_couriers
+from utils.restaurant_view import avg_std_time_on_traffic, distance
+from utils.spatial import build_spatial_index, grid_stats, orders_within
+from utils.rollup import build_rollup
+from utils.stats import build_panel_stats
+
+TAMANHOS = [10_000, 100_000, 1_000_000]
+
+# Filtros usados nas medições de rerun
+DATA_LIMITE = pd.Timestamp(2022, 3, 20)
+TRANSITO = ['Low', 'Medium', 'High', 'Jam']
+
+
+def country_maps(df, modo):
+    
+    """ HTML do mapa sem o cache de figuras, como em um rerun com filtros novos """
+    
+    figura = fl.Figure(width=1024, height=600)
+    figura.add_child(build_map(df, modo))
+    
+    return figura.render()
+
+
+def etapas(bruto, modos):
+    
+    """ Lista (fase, nome, função sem argumentos) das computações medidas
+        
+        As entradas de cada etapa (DataFrame preparado, filtrado, rollup e
+        acumuladores) são montadas aqui, fora das medições.
+    """
+    
+    df = prepare_data(bruto)
+    indice = build_filter_index(df)
+    filtrado = apply_filters(df, indice, DATA_LIMITE, TRANSITO)
+    
+    rollup = build_rollup(df)
+    esbocos = build_courier_sketches(df)
+    estatisticas = build_panel_stats(df)
+    espacial = build_spatial_index(df)
+    restaurante = espacial['restaurantes'].iloc[0]
+    tabelas = dict(estatisticas, pedidos=rollup['pedidos'], extremos=build_courier_extremes(df), esbocos=esbocos)
+    
+    # Fonte nova a cada chamada: as tabelas são filtradas dentro da medição, como em um rerun
+    def fonte():
+        return PandasBackend(df, indice, tabelas, espacial)
+    
+    lista = [
+        ('carga', 'clean_code', lambda: clean_code(bruto)),
+        ('carga', 'add_distance', lambda: add_distance(df)),
+        ('carga', 'add_order_timing', lambda: add_order_timing(df)),
+        ('carga', 'build_rollup', lambda: build_rollup(df)),
+        ('carga', 'build_courier_sketches', lambda: build_courier_sketches(df)),
+        ('carga', 'build_panel_stats', lambda: build_panel_stats(df)),
+        ('carga', 'build_spatial_index', lambda: build_spatial_index(df)),
+        ('rerun', 'distance', lambda: distance(fonte(), DATA_LIMITE, TRANSITO, True)),
+        ('rerun', 'rank_couriers', lambda: rank_couriers(filtrado)),
+        ('rerun', 'order_share_by_week', lambda: order_share_by_week(fonte(), DATA_LIMITE, TRANSITO)),
+        ('rerun', 'avg_std_time_on_traffic', lambda: avg_std_time_on_traffic(fonte(), DATA_LIMITE, TRANSITO)),
+        ('rerun', 'grid_stats', lambda: grid_stats(df, espacial, indice, DATA_LIMITE, TRANSITO)),
+        ('rerun', 'orders_within[3 km]', lambda: orders_within(df, espacial, indice, restaurante['Restaurant_latitude'], restaurante['Restaurant_longitude'], 3, DATA_LIMITE, TRANSITO)),
+    ]
+    
+    for modo in modos:
+        lista.append(('rerun', f'country_maps[{modo}]', lambda modo=modo: country_maps(filtrado, modo)))
+    
+    return lista
+
+
+def commit_atual():
+    
+    """ Hash curto do commit medido, ou None fora de um repositório git """
+    
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Tempo e pico de memória das computações do dashboard')
+    parser.add_argument('--linhas', type=int, nargs='+', default=TAMANHOS)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--mapas', nargs='*', default=MODOS, choices=MODOS)
+    parser.add_argument('--json', help='arquivo onde gravar os resultados')
+    args = parser.parse_args()
+    
+    resultados = []
+    aquecidas = set()
+    
+    print(f"{'linhas':>10} {'fase':>6} {'funcao':>26} {'tempo (s)':>10} {'pico (MB)':>10}")
+    
+    for linhas in args.linhas:
+        with tempfile.TemporaryDirectory() as pasta:
+            bruto = read_dataset(write_synthetic_csv(os.path.join(pasta, f'train_{linhas}.csv'), linhas, seed=args.seed))
+        
+        for fase, nome, funcao in etapas(bruto, args.mapas):
+            # A primeira chamada de cada função paga importações e
+            # inicializações preguiçosas (plotly, folium); fica fora da medição
+            if nome not in aquecidas:
+                funcao()
+                aquecidas.add(nome)
+            
+            _, segundos, pico = medir(funcao)
+            resultados.append({'linhas': linhas, 'fase': fase, 'funcao': nome, 'segundos': segundos, 'pico_mb': pico})
+            print(f"{linhas:>10} {fase:>6} {nome:>26} {segundos:>10.3f} {pico:>10.1f}")
+        
+        del bruto
+    
+    if args.json:
+        relatorio = {
+            'commit': commit_atual(),
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'seed': args.seed,
+            'resultados': resultados,
+        }
+        with open(args.json, 'w', encoding='utf-8') as saida:
+            json.dump(relatorio, saida, indent=2)
+
+
+if __name__ == '__main__':
+    main()
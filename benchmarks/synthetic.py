@@ -0,0 +1,264 @@
+# ==========================
+# Gerador de dados sintéticos no formato do train.csv
+#
+# Grava arquivos de entregas de qualquer tamanho com as mesmas colunas e o
+# mesmo texto que o clean_code espera: espaço no final dos textos, 'NaN '
+# nos valores ausentes, 'conditions NaN' no clima, datas em %d-%m-%Y e
+# Time_taken(min) como '(min) NN'. Cada entregador pertence a um restaurante
+# de uma das cidades base, e as coordenadas de restaurantes e entregas ficam
+# em torno dessa cidade.
+#
+# A geração é vetorizada: cada coluna é sorteada como índice em um pequeno
+# conjunto de textos prontos (já terminados em ',' ou '\n'), e cada bloco de
+# linhas vira uma matriz de bytes de largura fixa que é compactada por uma
+# máscara e gravada de uma vez. A mesma semente e o mesmo tamanho de bloco
+# geram sempre o mesmo arquivo.
+#
+# Uso:
+#   python -m benchmarks.synthetic dataset/synthetic.csv --linhas 10000000 --seed 0
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+COLUNAS = ['ID', 'Delivery_person_ID', 'Delivery_person_Age', 'Delivery_person_Ratings', 'Restaurant_latitude', 'Restaurant_longitude', 'Delivery_location_latitude', 'Delivery_location_longitude', 'Order_Date', 'Time_Orderd', 'Time_Order_picked', 'Weatherconditions', 'Road_traffic_density', 'Vehicle_condition', 'Type_of_order', 'Type_of_vehicle', 'multiple_deliveries', 'Festival', 'City', 'Time_taken(min)']
+
+# Cidades base: prefixo do Delivery_person_ID e coordenadas do centro
+CIDADES_BASE = {
+    'INDO': (22.7196, 75.8577),
+    'BANG': (12.9716, 77.5946),
+    'COIMB': (11.0168, 76.9558),
+    'CHEN': (13.0827, 80.2707),
+    'HYD': (17.3850, 78.4867),
+    'RANCHI': (23.3441, 85.3096),
+    'MYS': (12.2958, 76.6394),
+    'DEH': (30.3165, 78.0322),
+    'KOC': (9.9312, 76.2673),
+    'PUNE': (18.5204, 73.8567),
+    'JAP': (26.9124, 75.7873),
+    'SUR': (21.1702, 72.8311),
+}
+
+RESTAURANTES_POR_CIDADE = 20
+ENTREGADORES_POR_RESTAURANTE = 3
+
+# Locais de entrega sorteados por restaurante e afastamento máximo (graus)
+LOCAIS_POR_RESTAURANTE = 512
+RAIO_RESTAURANTE = 0.15
+RAIO_ENTREGA = 0.12
+
+TIPOS_CIDADE = ['Metropolitian ', 'Urban ', 'Semi-Urban ']
+PESOS_CIDADE = [0.75, 0.22, 0.03]
+TRANSITO = ['Low ', 'Jam ', 'Medium ', 'High ']
+PESOS_TRANSITO = [0.34, 0.31, 0.24, 0.11]
+CLIMA = ['conditions Fog', 'conditions Stormy', 'conditions Cloudy', 'conditions Sandstorms', 'conditions Windy', 'conditions Sunny']
+PEDIDOS = ['Snack ', 'Meal ', 'Drinks ', 'Buffet ']
+VEICULOS = ['motorcycle ', 'scooter ', 'electric_scooter ', 'bicycle ']
+PESOS_VEICULO = [0.58, 0.33, 0.08, 0.01]
+
+# Período coberto pelo train.csv original
+PRIMEIRO_DIA = pd.Timestamp(2022, 2, 11)
+DIAS = 55
+
+# Fração de 'NaN ' nas colunas que têm valores ausentes no arquivo original
+FRACAO_NAN = 0.02
+
+CHUNK_SIZE = 500_000
+
+_HEX = np.frombuffer(b'0123456789abcdef', dtype=np.uint8)
+
+
+class _Coluna:
+    
+    """ Conjunto de textos prontos de uma coluna, cada um completado com
+        bytes nulos até a mesma largura
+        
+        Os textos ficam como um array de elementos opacos (void): sortear as
+        linhas de um bloco é um gather simples, bem mais rápido que indexar
+        uma matriz de bytes.
+    """
+    
+    def __init__(self, textos, fim=','):
+        dados = np.array([(texto + fim).encode() for texto in textos])
+        self.largura = dados.dtype.itemsize
+        self.textos = dados.view(f'V{self.largura}')
+
+
+def _ausentes(rng, indices, coluna):
+    
+    """ Troca uma fração dos índices pelo último texto do conjunto ('NaN ') """
+    
+    indices[rng.random(len(indices)) < FRACAO_NAN] = len(coluna.textos) - 1
+    
+    return indices
+
+
+def _conjuntos(rng):
+    
+    """ Textos prontos de todas as colunas sorteadas, e os restaurantes """
+    
+    prefixos = list(CIDADES_BASE)
+    centros = np.array([CIDADES_BASE[prefixo] for prefixo in prefixos])
+    
+    # Restaurantes espalhados em torno do centro da cidade base
+    restaurantes = np.repeat(centros, RESTAURANTES_POR_CIDADE, axis=0) + rng.uniform(-RAIO_RESTAURANTE, RAIO_RESTAURANTE, (len(prefixos) * RESTAURANTES_POR_CIDADE, 2))
+    locais = np.repeat(restaurantes, LOCAIS_POR_RESTAURANTE, axis=0) + rng.uniform(-RAIO_ENTREGA, RAIO_ENTREGA, (len(restaurantes) * LOCAIS_POR_RESTAURANTE, 2))
+    
+    entregadores = [f'{prefixo}RES{restaurante:02d}DEL{numero:02d} ' for prefixo in prefixos for restaurante in range(1, RESTAURANTES_POR_CIDADE + 1) for numero in range(1, ENTREGADORES_POR_RESTAURANTE + 1)]
+    horarios = [f'{minuto // 60:02d}:{minuto % 60:02d}:00' for minuto in range(24 * 60)]
+    
+    return {
+        'Delivery_person_ID': _Coluna(entregadores),
+        'Delivery_person_Age': _Coluna([str(idade) for idade in range(20, 40)] + ['NaN ']),
+        'Delivery_person_Ratings': _Coluna([f'{nota / 10:.1f}' for nota in range(25, 51)] + ['NaN ']),
+        'Restaurant_latitude': _Coluna([f'{valor:.6f}' for valor in restaurantes[:, 0]]),
+        'Restaurant_longitude': _Coluna([f'{valor:.6f}' for valor in restaurantes[:, 1]]),
+        'Delivery_location_latitude': _Coluna([f'{valor:.6f}' for valor in locais[:, 0]]),
+        'Delivery_location_longitude': _Coluna([f'{valor:.6f}' for valor in locais[:, 1]]),
+        'Order_Date': _Coluna(pd.date_range(PRIMEIRO_DIA, periods=DIAS).strftime('%d-%m-%Y')),
+        'Time_Orderd': _Coluna(horarios + ['NaN ']),
+        'Time_Order_picked': _Coluna(horarios),
+        'Weatherconditions': _Coluna(CLIMA + ['conditions NaN']),
+        'Road_traffic_density': _Coluna(TRANSITO + ['NaN ']),
+        'Vehicle_condition': _Coluna(['0', '1', '2', '3']),
+        'Type_of_order': _Coluna(PEDIDOS),
+        'Type_of_vehicle': _Coluna(VEICULOS),
+        'multiple_deliveries': _Coluna(['0', '1', '2', '3', 'NaN ']),
+        'Festival': _Coluna(['No ', 'Yes ', 'NaN ']),
+        'City': _Coluna(TIPOS_CIDADE + ['NaN ']),
+        'Time_taken(min)': _Coluna([f'(min) {minutos}' for minutos in range(10, 55)], fim='\n'),
+    }
+
+
+def _ids(inicio, linhas, digitos):
+    
+    """ Matriz de bytes da coluna ID: '0x' + número da linha em hexadecimal + ' ,' """
+    
+    numeros = np.arange(inicio, inicio + linhas, dtype=np.int64)
+    deslocamentos = 4 * np.arange(digitos - 1, -1, -1)
+    hexa = _HEX[(numeros[:, None] >> deslocamentos) & 0xF]
+    
+    matriz = np.empty((linhas, digitos + 4), dtype=np.uint8)
+    matriz[:, :2] = np.frombuffer(b'0x', dtype=np.uint8)
+    matriz[:, 2:-2] = hexa
+    matriz[:, -2:] = np.frombuffer(b' ,', dtype=np.uint8)
+    
+    return matriz
+
+
+def _indices(rng, linhas, conjuntos):
+    
+    """ Sorteia o índice de cada coluna para um bloco de linhas
+        
+        O entregador define o restaurante (e daí as coordenadas); o tempo de
+        entrega cresce com o trânsito, o festival e as entregas múltiplas.
+    """
+    
+    entregador = rng.integers(0, len(conjuntos['Delivery_person_ID'].textos), linhas)
+    restaurante = entregador // ENTREGADORES_POR_RESTAURANTE
+    local = restaurante * LOCAIS_POR_RESTAURANTE + rng.integers(0, LOCAIS_POR_RESTAURANTE, linhas)
+    
+    pedido = rng.integers(0, 24 * 60, linhas)
+    coleta = (pedido + 5 * rng.integers(1, 4, linhas)) % (24 * 60)
+    
+    transito = rng.choice(len(TRANSITO), linhas, p=PESOS_TRANSITO)
+    festival = (rng.random(linhas) < 0.02).astype(np.int64)
+    multiplas = rng.choice(4, linhas, p=[0.31, 0.62, 0.05, 0.02])
+    
+    nivel_transito = np.array([0, 3, 1, 2])[transito]
+    tempo = 12 + 4 * nivel_transito + 14 * festival + 5 * multiplas + rng.integers(0, 20, linhas)
+    
+    indices = {
+        'Delivery_person_ID': entregador,
+        'Delivery_person_Age': rng.integers(0, 20, linhas),
+        'Delivery_person_Ratings': rng.integers(15, 26, linhas),
+        'Restaurant_latitude': restaurante,
+        'Restaurant_longitude': restaurante,
+        'Delivery_location_latitude': local,
+        'Delivery_location_longitude': local,
+        'Order_Date': rng.integers(0, DIAS, linhas),
+        'Time_Orderd': pedido,
+        'Time_Order_picked': coleta,
+        'Weatherconditions': rng.integers(0, len(CLIMA), linhas),
+        'Road_traffic_density': transito,
+        'Vehicle_condition': rng.integers(0, 4, linhas),
+        'Type_of_order': rng.integers(0, len(PEDIDOS), linhas),
+        'Type_of_vehicle': rng.choice(len(VEICULOS), linhas, p=PESOS_VEICULO),
+        'multiple_deliveries': multiplas,
+        'Festival': festival,
+        'City': rng.choice(len(TIPOS_CIDADE), linhas, p=PESOS_CIDADE),
+        'Time_taken(min)': np.clip(tempo, 10, 54) - 10,
+    }
+    
+    # As avaliações baixas ficam mais raras, como no arquivo original
+    baixas = rng.random(linhas) < 0.05
+    indices['Delivery_person_Ratings'][baixas] = rng.integers(0, 15, baixas.sum())
+    
+    for nome in ['Delivery_person_Age', 'Delivery_person_Ratings', 'Time_Orderd', 'Road_traffic_density', 'multiple_deliveries', 'Festival', 'City']:
+        _ausentes(rng, indices[nome], conjuntos[nome])
+    
+    _ausentes(rng, indices['Weatherconditions'], conjuntos['Weatherconditions'])
+    
+    return indices
+
+
+def _bloco(rng, inicio, linhas, conjuntos, digitos):
+    
+    """ Bytes de um bloco de linhas do CSV """
+    
+    indices = _indices(rng, linhas, conjuntos)
+    
+    ids = _ids(inicio, linhas, digitos)
+    largura = ids.shape[1] + sum(conjuntos[nome].largura for nome in COLUNAS[1:])
+    
+    # Cada linha vira uma faixa de largura fixa; como nenhum texto tem byte
+    # nulo, descartar os nulos remove o preenchimento mantendo a ordem
+    matriz = np.empty((linhas, largura), dtype=np.uint8)
+    matriz[:, :ids.shape[1]] = ids
+    
+    posicao = ids.shape[1]
+    for nome in COLUNAS[1:]:
+        coluna = conjuntos[nome]
+        escolhidos = indices[nome]
+        fim = posicao + coluna.largura
+        
+        matriz[:, posicao:fim] = coluna.textos[escolhidos].view(np.uint8).reshape(linhas, coluna.largura)
+        posicao = fim
+    
+    return matriz[matriz != 0].tobytes()
+
+
+def write_synthetic_csv(path, linhas, seed=0, chunksize=CHUNK_SIZE):
+    
+    """ Grava um CSV sintético no formato do train.csv
+        
+        Input: caminho de saída, quantidade de linhas, semente e linhas por bloco
+        Output: caminho gravado
+    """
+    
+    rng = np.random.default_rng(seed)
+    conjuntos = _conjuntos(rng)
+    digitos = max(4, len(f'{max(linhas - 1, 0):x}'))
+    
+    temporario = path + '.tmp'
+    with open(temporario, 'wb') as saida:
+        saida.write((','.join(COLUNAS) + '\n').encode())
+        for inicio in range(0, linhas, chunksize):
+            saida.write(_bloco(rng, inicio, min(chunksize, linhas - inicio), conjuntos, digitos))
+    
+    os.replace(temporario, path)
+    
+    return path
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Gera um CSV sintético de entregas no formato do train.csv')
+    parser.add_argument('saida')
+    parser.add_argument('--linhas', type=int, default=1_000_000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--chunksize', type=int, default=CHUNK_SIZE)
+    args = parser.parse_args()
+    
+    write_synthetic_csv(args.saida, args.linhas, args.seed, args.chunksize)
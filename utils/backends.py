@@ -0,0 +1,257 @@
+# ==========================
+# Fonte dos dados dos painéis
+#
+# Os painéis das páginas pedem cada resultado (pedidos por dia, média e
+# desvio por cidade, ranking de entregadores, mapa...) a uma fonte, com a
+# data limite e as condições de trânsito da barra lateral. Há duas fontes,
+# com os mesmos métodos e os mesmos valores (benchmarks/bench_sql.py confere
+# painel a painel; em tabelas agrupadas por chaves categóricas o pandas
+# segue a ordem das categorias e o SQLite a ordem do texto):
+#   'pandas': PandasBackend, sobre o DataFrame e as tabelas pré-agregadas do
+#             cache do processo (utils.data_loader, aquecido por
+#             utils.warmup); é o padrão
+#   'sql':    utils.sql_backend.SqlBackend, consultas ao banco SQLite ao lado
+#             do CSV, sem o DataFrame em memória
+# A fonte é escolhida pela variável de ambiente CURRY_BACKEND:
+#   CURRY_BACKEND=sql streamlit run Home.py
+#
+# Entregadores distintos vêm dos esboços HyperLogLog no PandasBackend
+# (estimativa, utils.distinct) e do COUNT DISTINCT no SqlBackend (exato);
+# com exato=True o PandasBackend também conta de forma exata.
+
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from utils.data_loader import DATASET_PATH, load_data, load_derived
+from utils.distinct import build_courier_sketches, distinct_couriers, exact_couriers, merge_courier_sketches
+from utils.filters import apply_filters, build_filter_index, filter_table
+from utils.maps import COLUNAS as MAPA_COLUNAS
+from utils.metrics import EXTREMOS, build_courier_extremes, merge_courier_extremes
+from utils.ranking import TOP_N, rank_couriers
+from utils.rollup import build_rollup, merge_rollup, orders_by
+from utils.spatial import build_spatial_index, grid_stats, orders_within
+from utils.sql_backend import SqlBackend, build_database
+from utils.stats import build_panel_stats, merge_panel_stats, summarize
+from utils.warmup import start_warmup
+
+BACKEND_VAR = 'CURRY_BACKEND'
+BACKENDS = ['pandas', 'sql']
+
+
+def selected_backend():
+    
+    """ Fonte escolhida por CURRY_BACKEND ('pandas' se não definida) """
+    
+    backend = os.environ.get(BACKEND_VAR, 'pandas').strip().lower() or 'pandas'
+    if backend not in BACKENDS:
+        raise ValueError(f'{BACKEND_VAR} desconhecido: {backend} (use um de {BACKENDS})')
+    
+    return backend
+
+
+class PandasBackend:
+    
+    """ Painéis sobre o DataFrame e as tabelas pré-agregadas
+        
+        Criado uma vez por rerun. Cada tabela é filtrada na primeira consulta
+        que a usa e reaproveitada pelas demais enquanto os filtros não mudam,
+        então só as tabelas dos painéis exibidos são filtradas.
+        
+        Input: Dataframe limpo, índice dos filtros (build_filter_index),
+               tabelas particionadas por dia e trânsito ('pedidos' do rollup,
+               acumuladores de utils.stats, 'extremos' e 'esbocos'), índice
+               espacial e se os entregadores distintos são contados de forma
+               exata
+    """
+    
+    def __init__(self, df, indice, tabelas, espacial=None, exato=False):
+        self._df = df
+        self._indice = indice
+        self._tabelas = tabelas
+        self._espacial = espacial
+        self._exato = exato
+        self._filtros = None
+        self._memo = {}
+    
+    def _filtrada(self, nome, date_cutoff, traffic_options):
+        
+        """ Tabela (ou 'linhas', o DataFrame) com os filtros da barra lateral """
+        
+        filtros = (pd.Timestamp(date_cutoff), tuple(traffic_options))
+        if filtros != self._filtros:
+            self._filtros, self._memo = filtros, {}
+        
+        if nome not in self._memo:
+            if nome == 'linhas':
+                self._memo[nome] = apply_filters(self._df, self._indice, date_cutoff, traffic_options)
+            else:
+                self._memo[nome] = filter_table(self._tabelas[nome], date_cutoff, traffic_options)
+        
+        return self._memo[nome]
+    
+    def _distintos(self, chaves, date_cutoff, traffic_options):
+        if self._exato:
+            return exact_couriers(self._filtrada('linhas', date_cutoff, traffic_options), chaves)
+        
+        return distinct_couriers(self._filtrada('esbocos', date_cutoff, traffic_options), chaves)
+    
+    def _pedidos_por(self, chaves, date_cutoff, traffic_options):
+        return orders_by({'pedidos': self._filtrada('pedidos', date_cutoff, traffic_options)}, chaves)
+    
+    # ==================== Visão empresa ====================
+    
+    def order_metric(self, date_cutoff, traffic_options):
+        df_aux = self._pedidos_por(['Order_Date'], date_cutoff, traffic_options)
+        df_aux.columns = ['order_date', 'qtde_entregas']
+        
+        return df_aux
+    
+    def order_by_week(self, date_cutoff, traffic_options):
+        return self._pedidos_por(['week_of_year'], date_cutoff, traffic_options)
+    
+    def traffic_order_city(self, date_cutoff, traffic_options):
+        return self._pedidos_por(['City', 'Road_traffic_density'], date_cutoff, traffic_options)
+    
+    def traffic_order_share(self, date_cutoff, traffic_options):
+        df_aux = self._pedidos_por(['Road_traffic_density'], date_cutoff, traffic_options)
+        df_aux['perc_ID'] = 100 * (df_aux['ID'] / df_aux['ID'].sum())
+        
+        return df_aux
+    
+    def order_share_by_week(self, date_cutoff, traffic_options):
+        
+        # Quantas entregas na semana / quantos entregadores únicos por semana
+        df_aux = pd.merge(self.order_by_week(date_cutoff, traffic_options), self._distintos(['week_of_year'], date_cutoff, traffic_options), how='inner', on='week_of_year')
+        df_aux['order_by_delivery'] = df_aux['ID'] / df_aux['Delivery_person_ID']
+        
+        return df_aux
+    
+    # ==================== Visão entregadores ====================
+    
+    def courier_extremes(self, date_cutoff, traffic_options):
+        
+        """ Menor e maior idade e condição do veículo """
+        
+        return self._filtrada('extremos', date_cutoff, traffic_options).agg(EXTREMOS)
+    
+    def avg_ratings_per_deliver(self, date_cutoff, traffic_options):
+        df = self._filtrada('linhas', date_cutoff, traffic_options)
+        
+        return df.loc[:, ['Delivery_person_ID', 'Delivery_person_Ratings']].groupby('Delivery_person_ID', observed=True).mean().reset_index()
+    
+    def ratings_by(self, chave, date_cutoff, traffic_options):
+        
+        """ Avaliação média e desvio padrão por trânsito ou por clima """
+        
+        return summarize(self._filtrada('avaliacao', date_cutoff, traffic_options), [chave], nomes=('Delivery_mean', 'Delivery_std'))
+    
+    def top_delivers(self, date_cutoff, traffic_options, n=TOP_N):
+        
+        """ Os n entregadores mais rápidos e os n mais lentos de cada cidade """
+        
+        return rank_couriers(self._filtrada('linhas', date_cutoff, traffic_options), n=n)
+    
+    # ==================== Visão restaurantes ====================
+    
+    def delivery_unique(self, date_cutoff, traffic_options):
+        return self._distintos(None, date_cutoff, traffic_options)
+    
+    def distance(self, date_cutoff, traffic_options, figura=False):
+        
+        """ Distância média (figura=False) ou distância média por cidade """
+        
+        # A coluna Distance é calculada uma única vez na carga (utils.geo.add_distance)
+        df = self._filtrada('linhas', date_cutoff, traffic_options)
+        if figura == False:
+            return np.round(df['Distance'].mean(), 2)
+        
+        return df.loc[:, ['City', 'Distance']].groupby('City', observed=True).mean().reset_index()
+    
+    def festival_time(self, date_cutoff, traffic_options):
+        return summarize(self._filtrada('tempo', date_cutoff, traffic_options), ['Festival'])
+    
+    def avg_std_time_graph(self, date_cutoff, traffic_options):
+        return summarize(self._filtrada('tempo', date_cutoff, traffic_options), ['City'])
+    
+    def avg_std_time_on_traffic(self, date_cutoff, traffic_options):
+        return summarize(self._filtrada('tempo', date_cutoff, traffic_options), ['City', 'Road_traffic_density'])
+    
+    def time_by_city_and_order(self, date_cutoff, traffic_options):
+        return summarize(self._filtrada('tempo', date_cutoff, traffic_options), ['City', 'Type_of_order'])
+    
+    def prep_time_by(self, chave, date_cutoff, traffic_options):
+        
+        """ Tempo de preparo médio e desvio padrão por cidade ou por hora do pedido """
+        
+        return summarize(self._filtrada('preparo', date_cutoff, traffic_options), [chave], nomes=('avg_prep', 'std_prep'))
+    
+    def restaurants(self):
+        return self._espacial['restaurantes']
+    
+    def grid_stats(self, date_cutoff, traffic_options):
+        return grid_stats(self._df, self._espacial, self._indice, date_cutoff, traffic_options)
+    
+    def orders_within(self, latitude, longitude, raio_km, date_cutoff, traffic_options):
+        return orders_within(self._df, self._espacial, self._indice, latitude, longitude, raio_km, date_cutoff, traffic_options)
+    
+    # ==================== Mapas ====================
+    
+    def map_points(self, date_cutoff, traffic_options):
+        return self._filtrada('linhas', date_cutoff, traffic_options).loc[:, MAPA_COLUNAS]
+
+
+def pandas_backend(path=DATASET_PATH, exato=False):
+    
+    """ PandasBackend sobre o DataFrame e os artefatos do cache do processo
+        
+        Input: caminho do CSV e se os entregadores distintos são exatos
+        Output: PandasBackend
+    """
+    
+    df = load_data(path)
+    indice = load_derived('indice_filtros', build_filter_index, path)
+    espacial = load_derived('indice_espacial', build_spatial_index, path)
+    
+    tabelas = dict(load_derived('estatisticas_paineis', build_panel_stats, path, mescla=merge_panel_stats))
+    tabelas['pedidos'] = load_derived('rollup_empresa', build_rollup, path, mescla=merge_rollup)['pedidos']
+    tabelas['extremos'] = load_derived('extremos_entregadores', build_courier_extremes, path, mescla=merge_courier_extremes)
+    tabelas['esbocos'] = load_derived('esbocos_entregadores', build_courier_sketches, path, mescla=merge_courier_sketches)
+    
+    return PandasBackend(df, indice, tabelas, espacial, exato=exato)
+
+
+def load_backend(path=DATASET_PATH):
+    
+    """ Fonte dos painéis escolhida por CURRY_BACKEND
+        
+        Com 'pandas', espera o aquecimento do cache (utils.warmup) e monta o
+        PandasBackend; com 'sql', só garante o banco atualizado, sem
+        carregar o DataFrame.
+        
+        Input: caminho do CSV
+        Output: PandasBackend ou SqlBackend
+    """
+    
+    if selected_backend() == 'sql':
+        return SqlBackend(path)
+    
+    start_warmup(path, esperar=True)
+    
+    return pandas_backend(path)
+
+
+def start_backend(path=DATASET_PATH):
+    
+    """ Começa a preparar a fonte dos painéis em segundo plano (usada pela
+        Home): aquecimento do cache com 'pandas', geração do banco com 'sql'
+        
+        Input: caminho do CSV
+    """
+    
+    if selected_backend() == 'pandas':
+        start_warmup(path)
+    elif os.path.exists(path):
+        threading.Thread(target=build_database, args=(path,), name='banco-sql', daemon=True).start()
@@ -0,0 +1,117 @@
+# ==========================
+# Gráficos da visão empresa
+#
+# Construtores dos gráficos da página 1, separados da página para que
+# possam ser importados (e medidos) sem uma sessão do Streamlit. Cada aba
+# da página tem uma função que monta só as figuras dela, passando pelo
+# cache de figuras: uma aba só é calculada quando é aberta e reaproveitada
+# até os filtros mudarem. Os dados de cada gráfico vêm da fonte dos painéis
+# (utils.backends: pandas ou SQLite), consultada só quando a figura não está
+# no cache. O plotly é importado dentro dos construtores, na primeira figura
+# pedida, e não na partida das páginas.
+
+from utils.figure_cache import cached_figure
+from utils.maps import map_html
+
+ABAS = ['Visão Gerencial', 'Visão Tática', 'Visão Geográfica']
+
+
+def order_share_by_week(fonte, date_cutoff, traffic_options):
+            
+    import plotly.express as px
+    
+    # Quantidade de pedidos por entregador por Semana
+    # Quantas entregas na semana / Quantos entregadores únicos por semana
+    df_aux = fonte.order_share_by_week(date_cutoff, traffic_options)
+    
+    # Gerando gráfico de linhas
+    grafico_linha = px.line( df_aux, x='week_of_year', y='order_by_delivery')
+    
+    return grafico_linha
+
+def order_by_week(fonte, date_cutoff, traffic_options):
+            
+    import plotly.express as px
+    
+    # Obtendo a quantidade de pedidos por semana
+    df_aux = fonte.order_by_week(date_cutoff, traffic_options)
+    
+    # Gerando gráfico de barras
+    grafico_linha = px.line(df_aux, x='week_of_year', y='ID')
+    
+    return grafico_linha
+
+def traffic_order_city(fonte, date_cutoff, traffic_options):
+                
+    import plotly.express as px
+    
+    df_aux = fonte.traffic_order_city(date_cutoff, traffic_options)
+    
+    grafico_bolhas = px.scatter(df_aux, x='City', y='Road_traffic_density', size='ID', color='City')
+    
+    return grafico_bolhas
+
+def traffic_order_share(fonte, date_cutoff, traffic_options):
+                
+    import plotly.express as px
+    
+    # Obtendo a porcentagem de pedidos
+    df_aux = fonte.traffic_order_share(date_cutoff, traffic_options)
+    
+    # Gerando um gráfico de pizza
+    grafico_pizza = px.pie( df_aux, values='perc_ID', names='Road_traffic_density')
+    
+    return grafico_pizza
+
+def order_metric(fonte, date_cutoff, traffic_options):
+            
+    import plotly.express as px
+    
+    # Obtendo a quantidade de pedidos por dia
+    df_aux = fonte.order_metric(date_cutoff, traffic_options)
+    
+    # Gerando um gráfico de barras
+    grafico_barras = px.bar(df_aux, x='order_date', y='qtde_entregas')
+    
+    return grafico_barras
+
+
+def management_figures(fonte, date_cutoff, traffic_options, chave):
+    
+    """ Figuras da aba Visão Gerencial
+        
+        Input: fonte dos painéis (utils.backends), data limite, condições de
+               trânsito e chave dos filtros (figure_cache.filter_key)
+        Output: dicionário nome -> figura
+    """
+    
+    return {nome: cached_figure(nome, chave, funcao, fonte, date_cutoff, traffic_options)
+            for nome, funcao in [('order_metric', order_metric),
+                                 ('traffic_order_share', traffic_order_share),
+                                 ('traffic_order_city', traffic_order_city)]}
+
+
+def tactical_figures(fonte, date_cutoff, traffic_options, chave):
+    
+    """ Figuras da aba Visão Tática
+        
+        Input: fonte dos painéis (utils.backends), data limite, condições de
+               trânsito e chave dos filtros (figure_cache.filter_key)
+        Output: dicionário nome -> figura
+    """
+    
+    return {nome: cached_figure(nome, chave, funcao, fonte, date_cutoff, traffic_options)
+            for nome, funcao in [('order_by_week', order_by_week),
+                                 ('order_share_by_week', order_share_by_week)]}
+
+
+def geographic_html(fonte, date_cutoff, traffic_options, modo, chave):
+    
+    """ HTML do mapa da aba Visão Geográfica
+        
+        Input: fonte dos painéis, data limite, condições de trânsito, modo do
+               mapa (maps.MODOS) e chave dos filtros
+        Output: HTML do mapa
+    """
+    
+    return map_html(fonte, date_cutoff, traffic_options, modo, chave, width=1024, height=600)
@@ -0,0 +1,645 @@
+# ==========================
+# Carregamento compartilhado do dataset
+#
+# O Streamlit reexecuta o script da página a cada interação com um widget.
+# Este módulo mantém o DataFrame já limpo em um cache do processo, de modo
+# que as três páginas compartilhem a mesma cópia e só voltem a ler o CSV
+# quando o arquivo mudar em disco. O CSV é lido em blocos de CHUNK_SIZE
+# linhas, de modo que o pico de memória da carga é o DataFrame limpo mais um
+# bloco cru, e não o arquivo inteiro como texto. Se o arquivo apenas cresceu (lotes
+# acrescentados por utils.ingest, inclusive a partir de outro processo), só
+# as linhas novas são lidas e incorporadas ao cache e ao arquivo colunar.
+
+import argparse
+import io
+import json
+import os
+import threading
+import zlib
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # pragma: no cover - sem pyarrow, o loader usa só o CSV
+    pa = None
+    feather = None
+
+from utils.dates import add_order_timing, add_week_of_year
+from utils.geo import add_distance
+from utils.memory import concat_frames, optimize_memory
+from utils.profiling import profiled
+
+DATASET_PATH = 'dataset/train.csv'
+
+# Colunas de texto com espaços extras e marcadores 'NaN ' no CSV original
+COLUNAS_TEXTO = ['ID', 'Delivery_person_ID', 'Delivery_person_Age', 'Delivery_person_Ratings', 'Order_Date', 'Time_Orderd', 'Time_Order_picked', 'Weatherconditions', 'Road_traffic_density', 'Type_of_order', 'Type_of_vehicle', 'multiple_deliveries', 'Festival', 'City', 'Time_taken(min)']
+VALORES_NAN = ['NaN', 'NaN ']
+
+# Chave dos metadados do arquivo colunar com a assinatura do CSV de origem
+_CHAVE_ORIGEM = b'curry_company.origem'
+
+# Versão das colunas derivadas; muda sempre que prepare_data passar a gerar
+# colunas diferentes, invalidando os arquivos colunares antigos
+VERSAO_ESQUEMA = 5
+
+# Linhas de cada bloco lido do CSV; define o pico de memória da leitura.
+# Configurável pela variável de ambiente CURRY_CHUNK_ROWS
+CHUNK_VAR = 'CURRY_CHUNK_ROWS'
+CHUNK_SIZE = int(os.environ.get(CHUNK_VAR, 100_000))
+
+# Bytes do fim do CSV conferidos para saber se o conteúdo anterior a um
+# append continua o mesmo
+BYTES_CONFERENCIA = 4096
+
+# ====================
+# Cache do processo
+# ====================
+# Cada entrada é (assinatura, Dataframe, artefatos, impressão do CSV); a
+# trava é reentrante porque load_data incorpora lotes via append_to_cache
+_cache = {}
+_cache_lock = threading.RLock()
+_cache_stats = {'hits': 0, 'misses': 0}
+
+
+@profiled()
+def clean_code(df):
+    
+    """ Esta função tem a responsabilidade de limpar o dataframe 
+        
+        Tipos de limpeza:
+        1. Remover os espaços das string
+        2. Excluir as linhas vazias
+        3. Conversões de tipos dados
+        4. Redefinir o índice do DataFrame
+        
+        Cada coluna de texto é fatorada uma única vez: o strip é aplicado só
+        aos valores distintos e os valores vazios (ausentes ou 'NaN') entram
+        em uma única máscara de linhas. O DataFrame de saída é montado uma só
+        vez, sem cópias intermediárias. Aceita tanto o CSV lido por
+        read_dataset quanto o CSV cru.
+        
+        Input: Dataframe
+        Output: Dataframe
+    """
+    
+    # 1. Remover os espaços das string (sobre os valores distintos)
+    vazias = np.zeros(len(df), dtype=bool)
+    fatorados = {}
+    for coluna in COLUNAS_TEXTO:
+        valores = df[coluna].to_numpy()
+        if valores.dtype == object:
+            codigos, distintos = pd.factorize(valores)
+            distintos = pd.Series(distintos, dtype=object).str.strip("(min) ").to_numpy()
+            vazias |= codigos == -1
+            vazias |= (distintos == 'NaN')[codigos] & (codigos != -1)
+            fatorados[coluna] = (codigos, distintos)
+        else:
+            vazias |= pd.isna(valores)
+
+    # 2. Excluir as linhas vazias (uma máscara para todas as colunas)
+    linhas = np.flatnonzero(~vazias)
+    
+    colunas = {}
+    for coluna in df.columns:
+        if coluna in fatorados:
+            codigos, distintos = fatorados[coluna]
+            colunas[coluna] = distintos[codigos[linhas]]
+        else:
+            colunas[coluna] = df[coluna].to_numpy()[linhas]
+    
+    # 3. Conversões de tipos dados
+    colunas['Delivery_person_Age'] = colunas['Delivery_person_Age'].astype(int)
+    colunas['Delivery_person_Ratings'] = colunas['Delivery_person_Ratings'].astype(float)
+    colunas['Order_Date'] = pd.to_datetime(colunas['Order_Date'], format='%d-%m-%Y').to_numpy()
+    colunas['Vehicle_condition'] = colunas['Vehicle_condition'].astype(int)
+    colunas['multiple_deliveries'] = colunas['multiple_deliveries'].astype(int)
+    colunas['Time_taken(min)'] = colunas['Time_taken(min)'].astype(int)
+
+    # 4. Redefinir o índice do DataFrame
+    df = pd.DataFrame(colunas, index=pd.RangeIndex(len(linhas)), columns=df.columns)
+    
+    return df
+
+
+def read_dataset(path, **kwargs):
+    
+    """ Lê o CSV de entregas tratando 'NaN ' como valor ausente já na leitura
+        
+        Input: caminho (ou buffer) do CSV e argumentos extras do read_csv
+        Output: Dataframe cru, pronto para o clean_code
+    """
+    
+    return pd.read_csv(path, na_values=VALORES_NAN, **kwargs)
+
+
+def file_signature(path):
+    
+    """ Identifica a versão do arquivo em disco: caminho absoluto, data de
+        modificação e tamanho. Qualquer alteração no arquivo muda a assinatura.
+        
+        Input: caminho do arquivo
+        Output: tupla (caminho, mtime_ns, tamanho)
+    """
+    
+    caminho = os.path.abspath(path)
+    info = os.stat(caminho)
+    
+    return (caminho, info.st_mtime_ns, info.st_size)
+
+
+def tail_fingerprint(path, tamanho):
+    
+    """ Impressão do CSV na versão de `tamanho` bytes: crc32 do cabeçalho e
+        dos últimos BYTES_CONFERENCIA bytes até esse ponto. Um append não a
+        altera; reescrever o fim do arquivo anterior, sim.
+        
+        Input: caminho do CSV e tamanho do arquivo na versão conferida
+        Output: inteiro, ou None se o arquivo tiver menos de `tamanho` bytes
+    """
+    
+    inicio = max(0, tamanho - BYTES_CONFERENCIA)
+    
+    with open(path, 'rb') as arquivo:
+        cabecalho = arquivo.readline()
+        arquivo.seek(inicio)
+        final = arquivo.read(tamanho - inicio)
+    
+    if len(final) < tamanho - inicio:
+        return None
+    
+    return zlib.crc32(final, zlib.crc32(cabecalho))
+
+
+def only_appended(anterior, impressao, assinatura):
+    
+    """ Diz se o CSV só recebeu linhas no fim desde a versão anterior
+        
+        Input: assinatura e impressão (tail_fingerprint) da versão anterior e
+               assinatura atual do arquivo
+        Output: True se os bytes novos podem ser lidos com read_appended
+    """
+    
+    return (anterior[0] == assinatura[0] and impressao is not None and anterior[2] < assinatura[2]
+            and tail_fingerprint(assinatura[0], anterior[2]) == impressao)
+
+
+def read_appended(path, inicio, fim):
+    
+    """ Lê e prepara só as linhas acrescentadas ao CSV entre dois tamanhos
+        
+        Input: caminho do CSV e os tamanhos do arquivo antes e depois do append
+        Output: Dataframe do lote (prepare_data), ou None se a faixa não
+                começar e terminar em fim de linha (append ainda em andamento
+                ou arquivo editado)
+    """
+    
+    with open(path, 'rb') as arquivo:
+        cabecalho = arquivo.readline()
+        arquivo.seek(inicio - 1)
+        anterior = arquivo.read(1)
+        corpo = arquivo.read(fim - inicio)
+    
+    if len(corpo) < fim - inicio or not corpo.endswith(b'\n') or not (anterior == b'\n' or corpo.startswith(b'\n')):
+        return None
+    
+    return prepare_data(read_dataset(io.BytesIO(cabecalho + corpo)))
+
+
+def extend_frame(df, lote):
+    
+    """ Acrescenta um lote ao DataFrame limpo mantendo a ordem por data
+        
+        O resultado é o mesmo do prepare_data sobre o arquivo com o lote no
+        fim: a ordenação estável deixa as linhas do histórico antes das do
+        lote em datas iguais.
+        
+        Input: Dataframe limpo e Dataframe do lote (prepare_data)
+        Output: Dataframe concatenado
+    """
+    
+    novo = concat_frames(df, lote)
+    # O lote normalmente traz datas novas e a ordem por data já está garantida
+    if len(df) and len(lote) and lote['Order_Date'].min() < df['Order_Date'].max():
+        novo = novo.sort_values('Order_Date', kind='stable', ignore_index=True)
+    
+    return novo
+
+
+@profiled()
+def prepare_data(df):
+    
+    """ Pipeline completo de carga: limpeza, colunas derivadas, otimização
+        de memória e ordenação por Order_Date (usada pelos filtros de data em
+        utils.filters). É o que fica guardado no cache e no arquivo colunar.
+        
+        Input: Dataframe cru (read_dataset)
+        Output: Dataframe pronto para as páginas
+    """
+    
+    df = clean_code(df)
+    df = add_distance(df)
+    df = add_week_of_year(df)
+    df = add_order_timing(df)
+    df = optimize_memory(df)
+    df = df.sort_values('Order_Date', kind='stable', ignore_index=True)
+    
+    return df
+
+
+def prepared_chunks(fonte, chunksize=CHUNK_SIZE):
+    
+    """ Lê o CSV em blocos de chunksize linhas e prepara cada bloco
+        
+        Só um bloco cru fica em memória por vez; as partes preparadas
+        (categorias e tipos reduzidos) ocupam uma fração do texto original.
+        
+        Input: caminho ou buffer do CSV e quantidade de linhas por bloco
+        Output: gerador de Dataframes preparados (prepare_data), na ordem do arquivo
+    """
+    
+    for bloco in read_dataset(fonte, chunksize=chunksize):
+        yield prepare_data(bloco)
+
+
+def merge_prepared(partes):
+    
+    """ Une partes preparadas na ordem do arquivo
+        
+        A ordenação estável por data sobre as partes em ordem reproduz a
+        ordem do prepare_data sobre o arquivo inteiro, e a segunda passada do
+        optimize_memory reduz os tipos como se as partes fossem uma só.
+        
+        Input: lista de Dataframes preparados
+        Output: Dataframe igual ao prepare_data do arquivo inteiro
+    """
+    
+    df = optimize_memory(concat_frames(*partes))
+    
+    return df.sort_values('Order_Date', kind='stable', ignore_index=True)
+
+
+def _marca_origem(origem):
+    
+    """ Valor gravado nos metadados do arquivo colunar: versão do esquema,
+        mtime/tamanho do CSV de origem e a impressão do CSV nesse tamanho """
+    
+    return json.dumps([VERSAO_ESQUEMA] + list(origem[1:]) + [tail_fingerprint(origem[0], origem[2])]).encode()
+
+
+def _origem_gravada(tabela):
+    
+    """ (versão, mtime, tamanho, impressão) gravados no arquivo colunar """
+    
+    metadados = tabela.schema.metadata or {}
+    if _CHAVE_ORIGEM not in metadados:
+        return None
+    
+    gravada = json.loads(metadados[_CHAVE_ORIGEM])
+    
+    return tuple(gravada) + (None,) * (4 - len(gravada))
+
+
+def columnar_path(path):
+    
+    """ Caminho do arquivo colunar (Feather) correspondente a um CSV """
+    
+    return os.path.splitext(path)[0] + '.feather'
+
+
+def write_columnar(df, path, origem):
+    
+    """ Grava o DataFrame limpo em Feather sem compressão e em um único lote
+        de registros, para que as colunas numéricas possam ser lidas por
+        memory-map sem cópia. A assinatura do CSV de origem vai nos metadados,
+        permitindo descobrir se o arquivo ficou desatualizado.
+        
+        Input: Dataframe limpo, caminho de saída e assinatura do CSV
+    """
+    
+    tabela = pa.Table.from_pandas(df, preserve_index=False)
+    metadados = dict(tabela.schema.metadata or {})
+    metadados[_CHAVE_ORIGEM] = _marca_origem(origem)
+    tabela = tabela.replace_schema_metadata(metadados)
+    
+    # Grava em um arquivo temporário e troca de uma vez, para que outra
+    # sessão nunca leia um arquivo pela metade
+    temporario = path + '.tmp'
+    # Com vários lotes (o padrão é um a cada 64k linhas) cada coluna teria de
+    # ser concatenada, e portanto copiada, na leitura
+    feather.write_feather(tabela, temporario, compression='uncompressed', chunksize=max(len(df), 1))
+    os.replace(temporario, path)
+
+
+def read_columnar(path, origem=None):
+    
+    """ Lê o arquivo colunar por memory-map
+        
+        As colunas numéricas e de datas sem ausentes viram arrays somente
+        leitura apontando para as páginas do arquivo (split_blocks evita que o
+        pandas as consolide em um bloco novo); só as colunas de texto e os
+        códigos das categorias são materializados. O self_destruct libera os
+        buffers do Arrow à medida que cada coluna é convertida.
+        
+        Input: caminho do Feather e, opcionalmente, a assinatura do CSV que
+               ele deve representar
+        Output: Dataframe limpo, ou None se o arquivo não corresponder ao CSV
+    """
+    
+    tabela = feather.read_table(path, memory_map=True)
+    
+    if origem is not None:
+        gravada = _origem_gravada(tabela)
+        if gravada is None or list(gravada[:3]) != [VERSAO_ESQUEMA] + list(origem[1:]):
+            return None
+    
+    return tabela.to_pandas(split_blocks=True, self_destruct=True)
+
+
+def build_columnar_cache(path=DATASET_PATH):
+    
+    """ Etapa de build: limpa o CSV e grava o arquivo colunar ao lado dele
+        
+        Input: caminho do CSV
+        Output: caminho do arquivo colunar gerado
+    """
+    
+    if pa is None:
+        raise ImportError('pyarrow é necessário para gerar o arquivo colunar')
+    
+    origem = file_signature(path)
+    destino = columnar_path(origem[0])
+    write_columnar(merge_prepared(list(prepared_chunks(origem[0]))), destino, origem)
+    
+    return destino
+
+
+def extend_columnar(destino, origem):
+    
+    """ Atualiza um arquivo colunar gravado antes de um append ao CSV
+        
+        Só as linhas acrescentadas depois da versão gravada são lidas e
+        limpas; o arquivo é regravado com elas no lugar de ser descartado.
+        
+        Input: caminho do Feather e assinatura atual do CSV
+        Output: Dataframe limpo, ou None se o CSV não apenas cresceu
+    """
+    
+    tabela = feather.read_table(destino, memory_map=True)
+    gravada = _origem_gravada(tabela)
+    
+    if gravada is None or gravada[0] != VERSAO_ESQUEMA or not only_appended((origem[0],) + tuple(gravada[1:3]), gravada[3], origem):
+        return None
+    
+    lote = read_appended(origem[0], gravada[2], origem[2])
+    if lote is None:
+        return None
+    
+    df = extend_frame(tabela.to_pandas(split_blocks=True, self_destruct=True), lote)
+    save_columnar(df, origem)
+    
+    return df
+
+
+def load_columnar(origem):
+    
+    """ Lê o arquivo colunar ao lado do CSV, se existir e estiver atualizado
+        (ou se o CSV só tiver recebido linhas novas desde que foi gravado)
+        
+        Input: assinatura do CSV
+        Output: Dataframe limpo, ou None
+    """
+    
+    destino = columnar_path(origem[0])
+    
+    if pa is None or not os.path.exists(destino):
+        return None
+    
+    try:
+        df = read_columnar(destino, origem)
+        return df if df is not None else extend_columnar(destino, origem)
+    except (OSError, pa.ArrowException):
+        return None
+
+
+def _load_clean(origem):
+    
+    """ Carrega o DataFrame limpo, preferindo o arquivo colunar
+        
+        Se houver um Feather atualizado ao lado do CSV, ele é lido por
+        memory-map. Caso contrário o CSV é lido e limpo em blocos, e o Feather
+        é gravado para as próximas partidas a frio.
+        
+        Input: assinatura do CSV
+        Output: Dataframe limpo
+    """
+    
+    df = load_columnar(origem)
+    if df is not None:
+        return df
+    
+    df = merge_prepared(list(prepared_chunks(origem[0])))
+    save_columnar(df, origem)
+    
+    return df
+
+
+def save_columnar(df, origem):
+    
+    """ Grava o arquivo colunar de uma carga feita a partir do CSV, se o
+        pyarrow estiver disponível; falhas de escrita são ignoradas
+        
+        Input: Dataframe limpo e assinatura do CSV de origem
+        Output: True se o arquivo foi gravado
+    """
+    
+    if pa is None:
+        return False
+    
+    try:
+        write_columnar(df, columnar_path(origem[0]), origem)
+    except (OSError, pa.ArrowException):
+        # Sem permissão de escrita: segue apenas com o cache em memória
+        return False
+    
+    return True
+
+
+@profiled()
+def load_data(path=DATASET_PATH):
+    
+    """ Carrega e limpa o dataset, reaproveitando o resultado entre reruns
+        
+        O DataFrame limpo fica guardado no cache do processo e é devolvido
+        enquanto a assinatura do arquivo (caminho, mtime e tamanho) não mudar.
+        Numa partida a frio, o arquivo colunar gerado por build_columnar_cache
+        é usado no lugar do CSV sempre que estiver atualizado.
+        Se o CSV só cresceu desde a versão em cache (lotes acrescentados por
+        utils.ingest, inclusive rodando em outro processo), apenas os bytes
+        novos são lidos e incorporados com append_to_cache, e o arquivo
+        colunar é regravado com eles.
+        O mesmo objeto é compartilhado entre sessões e páginas, portanto quem
+        chama não deve alterá-lo no lugar; os filtros das páginas já geram
+        cópias.
+        
+        Input: caminho do CSV
+        Output: Dataframe limpo
+    """
+    
+    assinatura = file_signature(path)
+    caminho = assinatura[0]
+    
+    with _cache_lock:
+        entrada = _cache.get(caminho)
+        if entrada is not None and entrada[0] == assinatura:
+            _cache_stats['hits'] += 1
+            return entrada[1]
+        
+        _cache_stats['misses'] += 1
+        
+        lote = None
+        if entrada is not None and only_appended(entrada[0], entrada[3], assinatura):
+            lote = read_appended(caminho, entrada[0][2], assinatura[2])
+        
+        if lote is not None and append_to_cache(path, lote, entrada[0], assinatura):
+            df = _cache[caminho][1]
+        else:
+            lote = None
+            df = _load_clean(assinatura)
+            _cache[caminho] = (assinatura, df, {}, tail_fingerprint(caminho, assinatura[2]))
+    
+    # Fora da trava: as outras sessões já usam o cache enquanto o arquivo
+    # colunar é regravado
+    if lote is not None:
+        save_columnar(df, assinatura)
+    
+    return df
+
+
+@profiled()
+def load_derived(nome, funcao, path=DATASET_PATH, mescla=None):
+    
+    """ Calcula (uma vez) um artefato derivado do dataset e o guarda no cache
+        
+        O artefato fica junto do DataFrame da mesma versão do arquivo, então é
+        descartado automaticamente quando o CSV muda. Serve para agregados
+        pré-calculados na carga, como o rollup da visão empresa.
+        
+        Se mescla for informada, um lote acrescentado por append_to_cache não
+        descarta o artefato: ele passa a ser mescla(artefato, funcao(lote)).
+        
+        Input: nome do artefato, função que recebe o Dataframe limpo, caminho
+               do CSV e, opcionalmente, a função de mescla
+        Output: resultado de funcao(df)
+    """
+    
+    df = load_data(path)
+    caminho = os.path.abspath(path)
+    
+    with _cache_lock:
+        derivados = _cache[caminho][2]
+        if nome in derivados:
+            return derivados[nome][0]
+    
+    resultado = funcao(df)
+    
+    with _cache_lock:
+        entrada = _cache.get(caminho)
+        # Só guarda se o arquivo não mudou enquanto o artefato era calculado
+        if entrada is not None and entrada[1] is df:
+            resultado = entrada[2].setdefault(nome, (resultado, funcao, mescla))[0]
+    
+    return resultado
+
+
+def install_cache(path, carregar):
+    
+    """ Preenche o cache com uma carga feita por fora do load_data (o
+        aquecimento em paralelo de utils.warmup)
+        
+        A carga roda com o cache travado, então sessões que chegam durante
+        ela esperam e já encontram o DataFrame pronto, em vez de repetir o
+        trabalho. Não faz nada se o cache já estiver com a versão atual.
+        
+        Input: caminho do CSV e função que recebe a assinatura do arquivo e
+               devolve (Dataframe limpo, {nome: (artefato, funcao, mescla)})
+        Output: True se o cache foi preenchido
+    """
+    
+    assinatura = file_signature(path)
+    caminho = assinatura[0]
+    
+    with _cache_lock:
+        entrada = _cache.get(caminho)
+        if entrada is not None and entrada[0] == assinatura:
+            return False
+        
+        df, derivados = carregar(assinatura)
+        _cache[caminho] = (assinatura, df, derivados, tail_fingerprint(caminho, assinatura[2]))
+    
+    return True
+
+
+def append_to_cache(path, lote, origem_anterior, assinatura=None):
+    
+    """ Incorpora ao cache um lote já acrescentado ao CSV, sem reler o arquivo
+        
+        Só age se o cache estiver com a versão do arquivo anterior ao append.
+        Os artefatos com função de mescla são atualizados a partir do lote;
+        os demais são descartados e recalculados sob demanda.
+        
+        Input: caminho do CSV, Dataframe do lote (prepare_data), assinatura
+               do CSV antes do append e, opcionalmente, a assinatura que o
+               lote completa (padrão: a atual do arquivo)
+        Output: True se o cache foi atualizado
+    """
+    
+    assinatura = assinatura or file_signature(path)
+    caminho = assinatura[0]
+    
+    with _cache_lock:
+        entrada = _cache.get(caminho)
+        if entrada is None or entrada[0] != origem_anterior:
+            return False
+        
+        df = extend_frame(entrada[1], lote)
+        
+        derivados = {}
+        for nome, (valor, funcao, mescla) in entrada[2].items():
+            if mescla is not None:
+                derivados[nome] = (mescla(valor, funcao(lote)), funcao, mescla)
+        
+        _cache[caminho] = (assinatura, df, derivados, tail_fingerprint(caminho, assinatura[2]))
+    
+    return True
+
+
+def cache_info():
+    
+    """ Retorna os contadores do cache: acertos, faltas e arquivos em memória
+        
+        Output: dicionário com 'hits', 'misses' e 'entries'
+    """
+    
+    with _cache_lock:
+        return {'hits': _cache_stats['hits'], 'misses': _cache_stats['misses'], 'entries': len(_cache)}
+
+
+def clear_cache():
+    
+    """ Esvazia o cache e zera os contadores """
+    
+    with _cache_lock:
+        _cache.clear()
+        _cache_stats['hits'] = 0
+        _cache_stats['misses'] = 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Gera o arquivo colunar (Feather) do dataset limpo')
+    parser.add_argument('--csv', default=DATASET_PATH)
+    args = parser.parse_args()
+    
+    print(build_columnar_cache(args.csv))
@@ -0,0 +1,98 @@
+# ==========================
+# Colunas de calendário e de horário vetorizadas
+
+import numpy as np
+import pandas as pd
+
+# 1970-01-01 (dia 0 do datetime64) foi uma quinta-feira: somando 4 o resto
+# da divisão por 7 fica 0 no domingo, como o '%w' do strftime
+DESLOCAMENTO_DOMINGO = 4
+
+MINUTOS_DIA = 24 * 60
+
+
+def week_of_year(datas):
+    
+    """ Semana do ano com domingo como primeiro dia, o mesmo número do
+        strftime('%U'): os dias antes do primeiro domingo do ano são a semana 0
+        
+        Calculada com aritmética sobre os datetime64, sem formatar texto
+        linha a linha.
+        
+        Input: Series de datas (datetime64)
+        Output: Series de inteiros (int8) com o mesmo índice
+    """
+    
+    dias = datas.to_numpy().astype('datetime64[D]')
+    dia_do_ano = (dias - dias.astype('datetime64[Y]')).astype(np.int64)
+    dia_da_semana = (dias.astype(np.int64) + DESLOCAMENTO_DOMINGO) % 7
+    
+    semanas = (dia_do_ano + 7 - dia_da_semana) // 7
+    
+    return pd.Series(semanas.astype(np.int8), index=datas.index, name='week_of_year')
+
+
+def add_week_of_year(df):
+    
+    """ Adiciona a coluna week_of_year (inteiro) calculada de Order_Date
+        
+        Input: Dataframe limpo
+        Output: o mesmo Dataframe, com a coluna week_of_year
+    """
+    
+    df['week_of_year'] = week_of_year(df['Order_Date'])
+    
+    return df
+
+
+def minutes_of_day(horarios):
+    
+    """ Minutos desde a meia-noite de horários em texto ('HH:MM:SS' ou 'HH:MM')
+        
+        Só os valores distintos são convertidos (são no máximo alguns
+        milhares de horários diferentes); ausentes, 'NaN' e textos fora do
+        formato viram NaN.
+        
+        Input: Series de horários (texto ou categoria)
+        Output: array float64 com os minutos (segundos como fração)
+    """
+    
+    codigos, distintos = pd.factorize(horarios)
+    partes = pd.Series(np.asarray(distintos, dtype=object), dtype=object).str.strip().str.split(':', expand=True)
+    
+    if partes.shape[1] < 2:
+        return np.full(len(codigos), np.nan)
+    
+    horas = pd.to_numeric(partes[0], errors='coerce')
+    minutos = pd.to_numeric(partes[1], errors='coerce')
+    segundos = pd.to_numeric(partes[2], errors='coerce').fillna(0) if partes.shape[1] > 2 else 0
+    
+    valores = horas * 60 + minutos + segundos / 60
+    validos = horas.between(0, 23) & minutos.between(0, 59)
+    valores = valores.where(validos).to_numpy(dtype='float64')
+    
+    # O código -1 (ausente) cai no NaN acrescentado ao final
+    return np.append(valores, np.nan)[codigos]
+
+
+def add_order_timing(df):
+    
+    """ Adiciona as colunas de tempo do pedido, derivadas de Time_Orderd e
+        Time_Order_picked
+        
+        'prep_minutes': minutos entre o pedido e a coleta (preparo na
+            cozinha); uma coleta com horário menor que o do pedido passou da
+            meia-noite e soma 24 h. NaN quando um dos horários falta.
+        'order_hour': hora do dia do pedido (0 a 23), -1 quando o horário falta
+        
+        Input: Dataframe limpo
+        Output: o mesmo Dataframe, com as duas colunas
+    """
+    
+    pedido = minutes_of_day(df['Time_Orderd'])
+    coleta = minutes_of_day(df['Time_Order_picked'])
+    
+    df['prep_minutes'] = np.mod(coleta - pedido, MINUTOS_DIA).astype('float32')
+    df['order_hour'] = np.where(np.isnan(pedido), -1, pedido // 60).astype(np.int8)
+    
+    return df
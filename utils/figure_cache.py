@@ -0,0 +1,130 @@
+# ==========================
+# Cache de figuras dos gráficos
+#
+# Guarda as figuras Plotly (e o HTML dos mapas) já montadas, indexadas pelo
+# id do gráfico e pelo estado dos filtros: versão do dataset, data limite e
+# condições de trânsito. Um rerun que não muda essas entradas (troca de aba,
+# outro widget) pula o construtor do gráfico. O cache é LRU, limitado em
+# quantidade de figuras e em bytes: o tamanho do HTML dos mapas e, nas
+# figuras Plotly, uma estimativa pela quantidade de valores das trilhas (sem
+# serializar a figura a cada falta do cache).
+
+import sys
+import threading
+from collections import OrderedDict
+
+from utils.profiling import stage
+
+# Limites do cache
+MAX_FIGURAS = 256
+MAX_BYTES = 128 * 2**20
+
+# Estimativa de uma figura Plotly: bytes por valor guardado nas trilhas e
+# bytes fixos do layout e do tema (~7 KB de JSON nas figuras das páginas)
+BYTES_POR_VALOR = 8
+BYTES_FIGURA = 8 * 2**10
+
+_figuras = OrderedDict()
+_figuras_lock = threading.Lock()
+_figuras_stats = {'hits': 0, 'misses': 0, 'bytes': 0}
+
+
+def filter_key(versao, date_cutoff, traffic_options):
+    
+    """ Chave do estado dos filtros, a mesma para todos os gráficos do rerun
+        
+        Input: versão do dataset (data_loader.file_signature), data limite e
+               condições de trânsito selecionadas
+        Output: tupla usada em cached_figure
+    """
+    
+    return (versao, date_cutoff, tuple(sorted(traffic_options)))
+
+
+def _valores(propriedades):
+    
+    """ Quantidade de valores nos arrays e listas das propriedades de uma
+        trilha (x, y, labels, marker.size, error_y.array, ...) """
+    
+    if isinstance(propriedades, dict):
+        return sum(_valores(valor) for valor in propriedades.values())
+    if isinstance(propriedades, str):
+        return 0
+    if hasattr(propriedades, 'size'):
+        return int(propriedades.size)
+    if isinstance(propriedades, (list, tuple)):
+        return len(propriedades)
+    
+    return 0
+
+
+def _tamanho(figura):
+    
+    """ Estimativa dos bytes ocupados por uma figura: o próprio HTML dos
+        mapas ou, nas figuras Plotly, o layout mais os valores das trilhas
+        (lidos no dicionário de propriedades de cada trilha, sem cópia; o
+        to_json serializaria a figura inteira a cada falta do cache) """
+    
+    if isinstance(figura, str):
+        return len(figura)
+    if hasattr(figura, 'data') and hasattr(figura, 'layout'):
+        valores = sum(_valores(getattr(trilha, '_props', None) or trilha.to_plotly_json()) for trilha in figura.data)
+        return BYTES_FIGURA + BYTES_POR_VALOR * valores
+    
+    return sys.getsizeof(figura)
+
+
+def cached_figure(chart_id, chave, construtor, *args, **kwargs):
+    
+    """ Devolve a figura do cache ou a monta com construtor(*args, **kwargs)
+        
+        A figura devolvida é compartilhada entre sessões e não deve ser
+        alterada no lugar.
+        
+        Input: id do gráfico, chave dos filtros (filter_key), construtor do
+               gráfico e seus argumentos
+        Output: figura
+    """
+    
+    chave = (chart_id,) + tuple(chave)
+    
+    with _figuras_lock:
+        if chave in _figuras:
+            _figuras.move_to_end(chave)
+            _figuras_stats['hits'] += 1
+            return _figuras[chave][0]
+        _figuras_stats['misses'] += 1
+    
+    with stage(f'figura {chart_id}'):
+        figura = construtor(*args, **kwargs)
+    tamanho = _tamanho(figura)
+    
+    with _figuras_lock:
+        if chave in _figuras:
+            _figuras_stats['bytes'] -= _figuras[chave][1]
+        _figuras[chave] = (figura, tamanho)
+        _figuras_stats['bytes'] += tamanho
+        
+        # Descarta as menos usadas recentemente até caber nos limites
+        while len(_figuras) > 1 and (len(_figuras) > MAX_FIGURAS or _figuras_stats['bytes'] > MAX_BYTES):
+            _, (_, removido) = _figuras.popitem(last=False)
+            _figuras_stats['bytes'] -= removido
+    
+    return figura
+
+
+def figure_cache_info():
+    
+    """ Contadores do cache: acertos, faltas, figuras e bytes em memória """
+    
+    with _figuras_lock:
+        return dict(_figuras_stats, figuras=len(_figuras))
+
+
+def clear_figure_cache():
+    
+    """ Esvazia o cache de figuras e zera os contadores """
+    
+    with _figuras_lock:
+        _figuras.clear()
+        _figuras_stats.update(hits=0, misses=0, bytes=0)
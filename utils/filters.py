@@ -0,0 +1,128 @@
+# ==========================
+# Filtros da barra lateral sobre o DataFrame ordenado por data
+#
+# O DataFrame limpo fica ordenado por Order_Date (prepare_data), então o
+# filtro "Order_Date < data limite" vira um corte posicional obtido por busca
+# binária, sem percorrer nem copiar as linhas. O filtro de trânsito usa
+# máscaras pré-calculadas por categoria, combinadas só no trecho já cortado.
+# As tabelas pré-agregadas (particionadas por dia e trânsito) são filtradas
+# por filter_table/filter_tables.
+
+import numpy as np
+import pandas as pd
+
+from utils.profiling import profiled
+
+
+def build_filter_index(df):
+    
+    """ Monta o índice usado por apply_filters
+        
+        'datas': datas distintas, em ordem crescente
+        'inicios': posição da primeira linha de cada data
+        'transito': máscara booleana das linhas de cada condição de trânsito
+        
+        Input: Dataframe limpo, ordenado por Order_Date
+        Output: dicionário com o índice
+    """
+    
+    datas, inicios = np.unique(df['Order_Date'].to_numpy(), return_index=True)
+    
+    transito = pd.Categorical(df['Road_traffic_density'])
+    codigos = transito.codes
+    mascaras = {categoria: codigos == codigo for codigo, categoria in enumerate(transito.categories)}
+    
+    return {'datas': datas, 'inicios': inicios, 'linhas': len(df), 'transito': mascaras}
+
+
+def date_offset(indice, date_cutoff):
+    
+    """ Quantidade de linhas com Order_Date anterior à data limite
+        
+        Input: índice de build_filter_index e data limite (exclusiva)
+        Output: posição do corte
+    """
+    
+    posicao = np.searchsorted(indice['datas'], np.datetime64(pd.Timestamp(date_cutoff)), side='left')
+    if posicao == len(indice['datas']):
+        return indice['linhas']
+    
+    return int(indice['inicios'][posicao])
+
+
+def filter_rows(indice, date_cutoff, traffic_options):
+    
+    """ Linhas que passam pelos filtros da barra lateral, sem tocar no DataFrame
+        
+        Input: índice de build_filter_index, data limite (exclusiva) e
+               condições de trânsito selecionadas
+        Output: (fim, linhas): as linhas filtradas estão entre as fim
+                primeiras; linhas é a máscara booleana delas (tamanho fim),
+                ou None se todas as condições estiverem selecionadas
+    """
+    
+    fim = date_offset(indice, date_cutoff)
+    
+    mascaras = indice['transito']
+    selecionadas = [mascaras[opcao] for opcao in set(traffic_options) if opcao in mascaras]
+    if len(selecionadas) == len(mascaras):
+        return fim, None
+    
+    linhas = np.zeros(fim, dtype=bool)
+    for mascara in selecionadas:
+        linhas |= mascara[:fim]
+    
+    return fim, linhas
+
+
+@profiled()
+def apply_filters(df, indice, date_cutoff, traffic_options):
+    
+    """ Aplica os filtros de data limite e de trânsito da barra lateral
+        
+        Com todas as condições de trânsito selecionadas o resultado é apenas
+        um corte posicional do DataFrame (sem cópia). O resultado não deve
+        ser alterado no lugar.
+        
+        Input: Dataframe limpo (ordenado), índice de build_filter_index, data
+               limite (exclusiva) e condições de trânsito selecionadas
+        Output: Dataframe filtrado
+    """
+    
+    fim, linhas = filter_rows(indice, date_cutoff, traffic_options)
+    df = df.iloc[:fim]
+    
+    if linhas is None:
+        return df
+    
+    return df.iloc[np.flatnonzero(linhas)]
+
+
+def filter_table(tabela, date_cutoff, traffic_options):
+    
+    """ Aplica os filtros da barra lateral a uma tabela pré-agregada
+        
+        Input: Dataframe com as colunas Order_Date e Road_traffic_density,
+               data limite (exclusiva) e lista de condições de trânsito
+        Output: Dataframe filtrado
+    """
+    
+    linhas = (tabela['Order_Date'] < date_cutoff) & tabela['Road_traffic_density'].isin(traffic_options)
+    
+    return tabela.loc[linhas, :]
+
+
+@profiled()
+def filter_tables(tabelas, date_cutoff, traffic_options):
+    
+    """ Aplica os filtros da barra lateral a tabelas pré-agregadas
+        
+        Cada tabela precisa ter as colunas Order_Date e Road_traffic_density
+        (rollup da visão empresa, acumuladores de utils.stats etc.).
+        
+        Input: dicionário de Dataframes, data limite (exclusiva) e lista de
+               condições de trânsito
+        Output: dicionário com as tabelas filtradas
+    """
+    
+    return {nome: filter_table(tabela, date_cutoff, traffic_options) for nome, tabela in tabelas.items()}
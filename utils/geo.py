@@ -0,0 +1,41 @@
+# ==========================
+# Cálculos geográficos vetorizados
+
+import numpy as np
+
+# Mesmo raio médio da Terra usado pela biblioteca haversine
+RAIO_TERRA_KM = 6371.0088
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    
+    """ Distância de grande círculo (haversine) entre pares de pontos
+        
+        Mesma fórmula de haversine.haversine, mas sobre arrays inteiros em vez
+        de um par de pontos por chamada.
+        
+        Input: latitudes e longitudes (graus) da origem e do destino
+        Output: array com as distâncias em km
+    """
+    
+    lat1 = np.radians(np.asarray(lat1, dtype=float))
+    lon1 = np.radians(np.asarray(lon1, dtype=float))
+    lat2 = np.radians(np.asarray(lat2, dtype=float))
+    lon2 = np.radians(np.asarray(lon2, dtype=float))
+    
+    d = np.sin((lat2 - lat1) * 0.5) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) * 0.5) ** 2
+    
+    return 2 * RAIO_TERRA_KM * np.arcsin(np.sqrt(d))
+
+
+def add_distance(df):
+    
+    """ Cria a coluna Distance: distância em km entre restaurante e local de entrega
+        
+        Input: Dataframe limpo
+        Output: o mesmo Dataframe, com a coluna Distance
+    """
+    
+    df['Distance'] = haversine_km(df['Restaurant_latitude'], df['Restaurant_longitude'], df['Delivery_location_latitude'], df['Delivery_location_longitude'])
+    
+    return df
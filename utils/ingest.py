@@ -0,0 +1,83 @@
+# ==========================
+# Ingestão incremental de lotes de pedidos
+#
+# Acrescenta um CSV de pedidos novos ao dataset, limpo com as mesmas regras
+# do clean_code. Rodando no processo do servidor, o lote é incorporado direto
+# ao cache; rodando à parte (linha de comando), o load_data do servidor
+# percebe que o arquivo só cresceu e lê apenas as linhas novas. Em nenhum
+# dos casos o histórico é relido.
+#
+# Uso:
+#   python -m utils.ingest lote.csv --csv dataset/train.csv
+
+import argparse
+import os
+
+from utils.data_loader import DATASET_PATH, append_to_cache, file_signature, prepare_data, read_dataset
+
+
+def _append_csv(lote_path, path):
+    
+    """ Acrescenta as linhas do CSV do lote ao CSV do dataset
+        
+        Os cabeçalhos precisam ser idênticos; o lote é copiado como texto, sem
+        reescrever o arquivo existente.
+    """
+    
+    with open(path, encoding='utf-8') as dataset:
+        cabecalho = dataset.readline()
+    
+    with open(lote_path, encoding='utf-8') as lote:
+        if lote.readline().strip() != cabecalho.strip():
+            raise ValueError(f'O cabeçalho de {lote_path} não corresponde ao de {path}')
+        corpo = lote.read()
+    
+    if not corpo:
+        return
+    if not corpo.endswith('\n'):
+        corpo += '\n'
+    
+    with open(path, 'rb+') as dataset:
+        # Garante a quebra de linha antes do primeiro registro do lote
+        dataset.seek(0, os.SEEK_END)
+        if dataset.tell() > 0:
+            dataset.seek(-1, os.SEEK_END)
+            if dataset.read(1) != b'\n':
+                dataset.write(b'\n')
+        dataset.write(corpo.encode('utf-8'))
+
+
+def append_batch(lote_path, path=DATASET_PATH):
+    
+    """ Acrescenta um lote de pedidos ao dataset
+        
+        1. Lê e limpa o lote (mesmas regras do clean_code)
+        2. Acrescenta as linhas ao CSV
+        3. Incorpora o lote ao cache do processo, se o dataset estiver carregado
+        
+        Input: caminho do CSV do lote e caminho do dataset
+        Output: dicionário com a quantidade de linhas lidas e incorporadas
+    """
+    
+    # 1. Lote limpo
+    bruto = read_dataset(lote_path)
+    lote = prepare_data(bruto)
+    
+    origem = file_signature(path)
+    
+    # 2. Append no CSV
+    _append_csv(lote_path, path)
+    
+    # 3. Cache do processo
+    append_to_cache(path, lote, origem)
+    
+    return {'linhas_lidas': len(bruto), 'linhas_incorporadas': len(lote)}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Acrescenta um lote de pedidos ao dataset')
+    parser.add_argument('lote')
+    parser.add_argument('--csv', default=DATASET_PATH)
+    args = parser.parse_args()
+    
+    print(append_batch(args.lote, args.csv))
@@ -0,0 +1,90 @@
+# ==========================
+# Mapas da visão geográfica
+#
+# Gera o HTML dos mapas Folium e o guarda no cache de figuras
+# (utils.figure_cache), indexado pela versão do dataset e pelos filtros
+# ativos. Um rerun com os mesmos filtros (troca de aba, outro widget)
+# reaproveita o HTML pronto em vez de reconstruir o mapa.
+#
+# Modos:
+#   'medianas': um marcador por (cidade, trânsito), na mediana dos locais de entrega
+#   'agrupado': todas as entregas, com FastMarkerCluster (marcadores agrupados
+#               e desenhados no navegador a partir de um único array)
+#   'calor':    mapa de calor de todas as entregas
+#
+# O folium é importado só ao montar um mapa (cache vazio para os filtros
+# ativos), e não na partida das páginas. As entregas do mapa são pedidas à
+# fonte dos painéis (utils.backends) também só nesse momento.
+
+from utils.figure_cache import cached_figure
+
+MODOS = ['medianas', 'agrupado', 'calor']
+
+# Colunas usadas pelos mapas
+COLUNAS = ['City', 'Road_traffic_density', 'Delivery_location_latitude', 'Delivery_location_longitude']
+
+# Casas decimais usadas para juntar pontos próximos no mapa de calor (~11 m)
+CASAS_CALOR = 4
+
+
+def _pontos(df):
+    return df.loc[:, ['Delivery_location_latitude', 'Delivery_location_longitude']]
+
+
+def build_map(df, modo='medianas'):
+    
+    """ Monta o mapa Folium das entregas
+        
+        Input: Dataframe filtrado e modo ('medianas', 'agrupado' ou 'calor')
+        Output: folium.Map
+    """
+    
+    import folium as fl
+    from folium.plugins import FastMarkerCluster, HeatMap
+    
+    mapa = fl.Map()
+    
+    if modo == 'medianas':
+        data_plot = df.loc[:, COLUNAS].groupby(['City', 'Road_traffic_density'], observed=True).median().reset_index()
+        
+        for linha in data_plot.itertuples(index=False):
+            fl.Marker([linha.Delivery_location_latitude, linha.Delivery_location_longitude], popup=f'{linha.City} - {linha.Road_traffic_density}').add_to(mapa)
+    
+    elif modo == 'agrupado':
+        FastMarkerCluster(_pontos(df).to_numpy().tolist()).add_to(mapa)
+    
+    elif modo == 'calor':
+        # Pontos muito próximos viram um único ponto com peso
+        pontos = _pontos(df).round(CASAS_CALOR).value_counts().reset_index()
+        HeatMap(pontos.to_numpy().tolist()).add_to(mapa)
+    
+    else:
+        raise ValueError(f'Modo de mapa desconhecido: {modo}')
+    
+    if len(df) and modo != 'medianas':
+        pontos = _pontos(df)
+        mapa.fit_bounds([pontos.min().tolist(), pontos.max().tolist()])
+    
+    return mapa
+
+
+def _render(fonte, date_cutoff, traffic_options, modo, width, height):
+    import folium as fl
+    
+    figura = fl.Figure(width=width, height=height)
+    figura.add_child(build_map(fonte.map_points(date_cutoff, traffic_options), modo))
+    
+    return figura.render()
+
+
+def map_html(fonte, date_cutoff, traffic_options, modo, chave, width=1024, height=600):
+    
+    """ HTML do mapa, reaproveitado do cache quando a chave se repete
+        
+        Input: fonte dos painéis (utils.backends), data limite, condições de
+               trânsito, modo, chave dos filtros ativos
+               (figure_cache.filter_key) e dimensões do mapa
+        Output: HTML pronto para st.components.v1.html
+    """
+    
+    return cached_figure(('mapa', modo, width, height), chave, _render, fonte, date_cutoff, traffic_options, modo, width, height)
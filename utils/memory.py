@@ -0,0 +1,119 @@
+# ==========================
+# Otimização de memória do DataFrame limpo
+#
+# Converte as colunas de texto de baixa cardinalidade em categorias e reduz
+# os números para o menor tipo que comporta os valores (int8/int16/float32).
+# As coordenadas continuam em float64 para não alterar as distâncias.
+
+import argparse
+
+import pandas as pd
+
+# Colunas sempre guardadas como categorias
+COLUNAS_CATEGORICAS = ['City', 'Road_traffic_density', 'Weatherconditions', 'Type_of_order', 'Type_of_vehicle', 'Festival']
+
+# Colunas inteiras reduzidas com pd.to_numeric(downcast='integer')
+COLUNAS_INTEIRAS = ['Delivery_person_Age', 'Vehicle_condition', 'multiple_deliveries', 'Time_taken(min)']
+
+# Colunas de ponto flutuante que toleram float32
+COLUNAS_FLOAT32 = ['Delivery_person_Ratings']
+
+# Demais colunas de texto viram categoria quando a razão valores distintos /
+# linhas fica abaixo deste limite (ID, que é único por linha, continua texto)
+LIMITE_CARDINALIDADE = 0.5
+
+
+def optimize_memory(df, limite_cardinalidade=LIMITE_CARDINALIDADE):
+    
+    """ Reduz a memória ocupada pelo DataFrame limpo
+        
+        1. Colunas de COLUNAS_CATEGORICAS viram categorias
+        2. Outras colunas de texto viram categorias se tiverem poucos valores distintos
+        3. Inteiros são reduzidos para int8/int16 e as avaliações para float32
+        
+        Input: Dataframe limpo
+        Output: o mesmo Dataframe, com as colunas convertidas
+    """
+    
+    # 1. Categorias fixas
+    for coluna in COLUNAS_CATEGORICAS:
+        df[coluna] = df[coluna].astype('category')
+    
+    # 2. Texto de baixa cardinalidade
+    for coluna in df.columns:
+        if df[coluna].dtype == object and df[coluna].nunique() < limite_cardinalidade * len(df):
+            df[coluna] = df[coluna].astype('category')
+    
+    # 3. Números menores
+    for coluna in COLUNAS_INTEIRAS:
+        df[coluna] = pd.to_numeric(df[coluna], downcast='integer')
+    
+    for coluna in COLUNAS_FLOAT32:
+        df[coluna] = df[coluna].astype('float32')
+    
+    return df
+
+
+def concat_frames(df, *lotes):
+    
+    """ Concatena Dataframes otimizados mantendo as categorias
+        
+        O pd.concat transforma em texto as colunas categóricas cujas
+        categorias diferem; aqui as categorias de todas as partes são unidas
+        antes da concatenação. Os tipos do primeiro Dataframe prevalecem
+        (um lote pequeno pode não ter atingido o limite de cardinalidade).
+        
+        Input: Dataframe existente e um ou mais Dataframes de lotes
+        Output: Dataframe concatenado, com índice novo
+    """
+    
+    partes = [parte.copy(deep=False) for parte in (df,) + lotes]
+    
+    for coluna in df.columns:
+        if isinstance(df[coluna].dtype, pd.CategoricalDtype):
+            for parte in partes[1:]:
+                parte[coluna] = parte[coluna].astype('category')
+            categorias = pd.api.types.union_categoricals([parte[coluna] for parte in partes], sort_categories=True).categories
+            for parte in partes:
+                if not parte[coluna].cat.categories.equals(categorias):
+                    parte[coluna] = parte[coluna].cat.set_categories(categorias)
+        else:
+            for parte in partes[1:]:
+                if isinstance(parte[coluna].dtype, pd.CategoricalDtype):
+                    parte[coluna] = parte[coluna].astype(df[coluna].dtype)
+    
+    return pd.concat(partes, ignore_index=True)
+
+
+def memory_report(antes, depois):
+    
+    """ Compara a memória ocupada por coluna antes e depois da otimização
+        
+        Input: Dataframe original e Dataframe otimizado
+        Output: Dataframe com tipo e bytes de cada coluna, mais a linha 'Total'
+    """
+    
+    relatorio = pd.DataFrame({
+        'dtype_antes': antes.dtypes.astype(str),
+        'dtype_depois': depois.dtypes.astype(str),
+        'bytes_antes': antes.memory_usage(index=False, deep=True),
+        'bytes_depois': depois.memory_usage(index=False, deep=True),
+    })
+    relatorio.loc['Total', ['bytes_antes', 'bytes_depois']] = relatorio[['bytes_antes', 'bytes_depois']].sum()
+    relatorio['bytes_antes'] = relatorio['bytes_antes'].astype('int64')
+    relatorio['bytes_depois'] = relatorio['bytes_depois'].astype('int64')
+    relatorio['reducao'] = 1 - relatorio['bytes_depois'] / relatorio['bytes_antes']
+    
+    return relatorio
+
+
+if __name__ == '__main__':
+    from utils.data_loader import DATASET_PATH, clean_code, read_dataset
+    
+    parser = argparse.ArgumentParser(description='Relatório de memória do dataset limpo antes e depois da otimização')
+    parser.add_argument('--csv', default=DATASET_PATH)
+    args = parser.parse_args()
+    
+    df = clean_code(read_dataset(args.csv))
+    antes = df.copy()
+    print(memory_report(antes, optimize_memory(df)).to_string())
@@ -0,0 +1,90 @@
+# ==========================
+# Métricas dos cartões (st.metric) das páginas
+#
+# Os cartões de uma linha costumam sair do mesmo agrupamento: os quatro de
+# festival (média e desvio com e sem festival) e os quatro de entregadores
+# (idade e condição do veículo, menor e maior). O MetricsProvider pede cada
+# grupo à fonte dos painéis (utils.backends) uma única vez por rerun, na
+# primeira vez em que um cartão dele é pedido, e serve os demais do
+# resultado guardado.
+
+import numpy as np
+import pandas as pd
+
+from utils.memory import concat_frames
+
+# Partição da tabela de extremos, a mesma dos acumuladores de utils.stats
+PARTICAO = ['Order_Date', 'Road_traffic_density']
+
+EXTREMOS = {'idade_min': 'min', 'idade_max': 'max', 'condicao_min': 'min', 'condicao_max': 'max'}
+
+
+def build_courier_extremes(df):
+    
+    """ Menor e maior idade e condição do veículo por dia e trânsito
+        
+        Input: Dataframe limpo
+        Output: Dataframe com Order_Date, Road_traffic_density e os extremos
+    """
+    
+    return pd.DataFrame({
+        'idade_min': df['Delivery_person_Age'], 'idade_max': df['Delivery_person_Age'],
+        'condicao_min': df['Vehicle_condition'], 'condicao_max': df['Vehicle_condition'],
+    }).groupby([df[coluna] for coluna in PARTICAO], observed=True).agg(EXTREMOS).reset_index()
+
+
+def merge_courier_extremes(extremos, novos):
+    
+    """ Junta a tabela de extremos de um lote novo à existente """
+    
+    return concat_frames(extremos, novos).groupby(PARTICAO, observed=True).agg(EXTREMOS).reset_index()
+
+
+class MetricsProvider:
+    
+    """ Fornece os valores dos cartões com os filtros da barra lateral
+        
+        Criado uma vez por rerun, depois dos filtros da barra lateral. Cada
+        grupo de métricas é consultado na primeira vez e reaproveitado pelos
+        outros cartões do mesmo grupo.
+        
+        Input: fonte dos painéis (utils.backends), data limite e condições
+               de trânsito
+    """
+    
+    def __init__(self, fonte, date_cutoff, traffic_options):
+        self._fonte = fonte
+        self._filtros = (date_cutoff, traffic_options)
+        self._memo = {}
+    
+    def _grupo(self, nome, funcao):
+        if nome not in self._memo:
+            self._memo[nome] = funcao()
+        return self._memo[nome]
+    
+    def _festival(self):
+        df_aux = self._fonte.festival_time(*self._filtros)
+        
+        valores = {}
+        for _, linha in df_aux.iterrows():
+            for op in ['avg_time', 'std_time']:
+                valores[(linha['Festival'], op)] = np.round(linha[op], 2)
+        
+        return valores
+    
+    def _extremos(self):
+        return self._fonte.courier_extremes(*self._filtros)
+    
+    def festival_time(self, festival, op):
+        
+        """ Média ('avg_time') ou desvio padrão ('std_time') do tempo de
+            entrega com (festival='Yes') ou sem ('No') festival, com 2 casas """
+        
+        return self._grupo('festival', self._festival).get((festival, op), np.nan)
+    
+    def courier_extreme(self, nome):
+        
+        """ Um dos extremos de entregadores: 'idade_min', 'idade_max',
+            'condicao_min' ou 'condicao_max' """
+        
+        return self._grupo('extremos', self._extremos)[nome]
@@ -0,0 +1,205 @@
+# ==========================
+# Perfil de cada rerun das páginas
+#
+# Cada página abre um perfil no início do script (start_rerun) e o fecha no
+# fim (finish_rerun). Enquanto ele está aberto, as etapas marcadas com o
+# context manager stage ou com o decorador profiled registram tempo de
+# parede e variação da memória residente do processo; etapas aninhadas
+# guardam o nível. Fora de um rerun (CLIs, benchmarks) as marcações não
+# registram nada.
+#
+# Ao fechar, o perfil vira uma linha JSON no logger 'curry_company.profiling'.
+# Com a variável de ambiente CURRY_PROFILE_LOG apontando para um arquivo,
+# essas linhas são gravadas nele (uma por rerun), prontas para agregar os
+# pontos quentes sob tráfego real. O painel da barra lateral (profile_panel)
+# mostra o perfil do último rerun.
+
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None
+
+LOG_VAR = 'CURRY_PROFILE_LOG'
+
+logger = logging.getLogger('curry_company.profiling')
+
+if os.environ.get(LOG_VAR):
+    _handler = logging.FileHandler(os.environ[LOG_VAR], encoding='utf-8')
+    _handler.setFormatter(logging.Formatter('%(message)s'))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+
+# O Streamlit executa o script de cada sessão na sua própria thread
+_local = threading.local()
+
+
+def memory_mb():
+    
+    """ Memória residente do processo em MB (None se não der para medir)
+        
+        No Linux vem de /proc/self/statm; em outros sistemas Unix usa o pico
+        do getrusage, então as variações ficam aproximadas.
+    """
+    
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2**20
+    except (OSError, ValueError, AttributeError):
+        pass
+    
+    if resource is not None:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 2**10
+    
+    return None
+
+
+class RerunProfile:
+    
+    """ Etapas registradas durante um rerun de uma página """
+    
+    def __init__(self, pagina):
+        self.pagina = pagina
+        self.inicio = datetime.now(timezone.utc)
+        self.etapas = []
+        self.total = None
+        self._relogio = time.perf_counter()
+        self._memoria = memory_mb()
+        self._nivel = 0
+    
+    def record(self, nome, segundos, memoria, nivel):
+        self.etapas.append({'etapa': nome, 'nivel': nivel, 'segundos': segundos, 'memoria_mb': memoria})
+    
+    def as_dict(self):
+        return {
+            'pagina': self.pagina,
+            'inicio': self.inicio.isoformat(),
+            'total_segundos': self.total,
+            'memoria_inicial_mb': self._memoria,
+            'etapas': self.etapas,
+        }
+    
+    def frame(self):
+        
+        """ Etapas como Dataframe, com a indentação do nível no nome """
+        
+        df = pd.DataFrame(self.etapas, columns=['etapa', 'nivel', 'segundos', 'memoria_mb'])
+        df['etapa'] = ['· ' * nivel + etapa for etapa, nivel in zip(df['etapa'], df['nivel'])]
+        
+        return df.drop(columns='nivel')
+
+
+def start_rerun(pagina):
+    
+    """ Abre o perfil do rerun atual da página
+        
+        Input: nome da página
+        Output: RerunProfile
+    """
+    
+    _local.perfil = RerunProfile(pagina)
+    
+    return _local.perfil
+
+
+def current_profile():
+    
+    """ Perfil aberto na thread atual, ou None fora de um rerun """
+    
+    return getattr(_local, 'perfil', None)
+
+
+@contextmanager
+def stage(nome):
+    
+    """ Marca uma etapa do rerun: registra tempo e variação de memória
+        
+        Input: nome da etapa
+    """
+    
+    perfil = current_profile()
+    if perfil is None:
+        yield
+        return
+    
+    nivel = perfil._nivel
+    perfil._nivel += 1
+    
+    # A etapa entra na lista antes das aninhadas, para manter a ordem de leitura
+    posicao = len(perfil.etapas)
+    perfil.record(nome, None, None, nivel)
+    
+    memoria = memory_mb()
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        segundos = time.perf_counter() - inicio
+        depois = memory_mb()
+        perfil.etapas[posicao].update(segundos=segundos, memoria_mb=None if memoria is None or depois is None else depois - memoria)
+        perfil._nivel = nivel
+
+
+def profiled(nome=None):
+    
+    """ Decorador que executa a função dentro de stage(nome)
+        
+        Input: nome da etapa (padrão: nome da função)
+    """
+    
+    def decorador(funcao):
+        etapa = nome or funcao.__name__
+        
+        @functools.wraps(funcao)
+        def envolvida(*args, **kwargs):
+            with stage(etapa):
+                return funcao(*args, **kwargs)
+        
+        return envolvida
+    
+    return decorador
+
+
+def finish_rerun():
+    
+    """ Fecha o perfil do rerun atual e o envia ao log como uma linha JSON
+        
+        Output: RerunProfile fechado (None se nenhum estava aberto)
+    """
+    
+    perfil = current_profile()
+    if perfil is None:
+        return None
+    
+    perfil.total = time.perf_counter() - perfil._relogio
+    _local.perfil = None
+    
+    logger.info(json.dumps(perfil.as_dict(), ensure_ascii=False))
+    
+    return perfil
+
+
+def profile_panel(perfil):
+    
+    """ Painel opcional da barra lateral com o perfil do rerun
+        
+        Input: RerunProfile devolvido por finish_rerun
+    """
+    
+    import streamlit as st
+    
+    if perfil is None or not st.sidebar.checkbox('Mostrar perfil do rerun', key='mostrar_perfil'):
+        return
+    
+    st.sidebar.markdown(f"### Perfil do rerun: {1000 * perfil.total:.0f} ms")
+    st.sidebar.dataframe(perfil.frame().style.format({'segundos': '{:.4f}', 'memoria_mb': '{:+.1f}'}, na_rep='-'))
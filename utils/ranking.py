@@ -0,0 +1,38 @@
+# ==========================
+# Ranking dos entregadores por tempo médio de entrega
+
+from utils.profiling import profiled
+
+# Quantidade de entregadores por cidade em cada ranking
+TOP_N = 10
+
+
+@profiled()
+def rank_couriers(df, n=TOP_N):
+    
+    """ Os n entregadores mais rápidos e os n mais lentos de cada cidade
+        
+        O tempo médio por (cidade, entregador) é calculado uma única vez e
+        cada cidade seleciona os extremos com nsmallest/nlargest (seleção
+        parcial), sem ordenar o resultado inteiro. Considera todas as cidades
+        presentes nos dados.
+        
+        Input: Dataframe filtrado e quantidade de entregadores por cidade
+        Output: (mais rápidos, mais lentos), cada um com as colunas City,
+                Delivery_person_ID e Time_taken(min)
+    """
+    
+    # Uma linha por (cidade, entregador); ordenar esse índice pequeno deixa
+    # as cidades em ordem alfabética no resultado
+    medias = df['Time_taken(min)'].groupby([df['City'], df['Delivery_person_ID']], observed=True).mean().sort_index(level='City', sort_remaining=False)
+    # Sem linhas filtradas o nsmallest perderia o nível do entregador; as
+    # médias vazias já têm as três colunas
+    if medias.empty:
+        return medias.reset_index(), medias.reset_index()
+    
+    por_cidade = medias.groupby(level='City', observed=True, group_keys=False)
+    
+    mais_rapidos = por_cidade.nsmallest(n).reset_index()
+    mais_lentos = por_cidade.nlargest(n).reset_index()
+    
+    return mais_rapidos, mais_lentos
@@ -0,0 +1,70 @@
+# ==========================
+# Gráficos da visão restaurantes
+#
+# Construtores dos gráficos da página 3, separados da página para que
+# possam ser importados (e medidos) sem uma sessão do Streamlit. Os dados de
+# cada gráfico vêm da fonte dos painéis (utils.backends). O plotly é
+# importado dentro dos construtores, na primeira figura pedida.
+
+import numpy as np
+
+
+def avg_std_time_on_traffic(fonte, date_cutoff, traffic_options):
+            
+    import plotly.express as px
+    
+    df_selecionado = fonte.avg_std_time_on_traffic(date_cutoff, traffic_options)
+    
+    fig = px.sunburst(df_selecionado, path=['City', 'Road_traffic_density'], values='avg_time', color='std_time', color_continuous_scale='RdBu', color_continuous_midpoint=np.average(df_selecionado['std_time']))
+    
+    return fig
+
+def avg_std_time_graph(fonte, date_cutoff, traffic_options):
+    
+    import plotly.graph_objects as go
+    
+    df_selecionado = fonte.avg_std_time_graph(date_cutoff, traffic_options)
+    
+    fig = go.Figure()
+    fig.add_trace(go.Bar(name='Control', x=df_selecionado['City'], y=df_selecionado['avg_time'], error_y=dict(type='data', array=df_selecionado['std_time'])))
+    fig.update_layout(barmode='group')
+    
+    return fig
+
+def distance(fonte, date_cutoff, traffic_options, figura):
+    if figura == False:
+        
+        avg_distance = fonte.distance(date_cutoff, traffic_options, figura=False)
+        return avg_distance
+    else:
+        import plotly.graph_objects as go
+        
+        avg_distance = fonte.distance(date_cutoff, traffic_options, figura=True)
+        fig = go.Figure(data=[go.Pie(labels=avg_distance['City'], values=avg_distance['Distance'], pull=[0, 0.1, 0])])
+        return fig
+
+def prep_time_by_city(fonte, date_cutoff, traffic_options):
+    
+    import plotly.graph_objects as go
+    
+    # Tempo de preparo (pedido até a coleta) por cidade
+    df_selecionado = fonte.prep_time_by('City', date_cutoff, traffic_options)
+    
+    fig = go.Figure()
+    fig.add_trace(go.Bar(name='Preparo', x=df_selecionado['City'], y=df_selecionado['avg_prep'], error_y=dict(type='data', array=df_selecionado['std_prep'])))
+    fig.update_layout(barmode='group', yaxis_title='minutos')
+    
+    return fig
+
+def prep_time_by_hour(fonte, date_cutoff, traffic_options):
+    
+    import plotly.graph_objects as go
+    
+    # Tempo de preparo pela hora do pedido: carga da cozinha ao longo do dia
+    df_selecionado = fonte.prep_time_by('order_hour', date_cutoff, traffic_options)
+    
+    fig = go.Figure()
+    fig.add_trace(go.Bar(name='Preparo', x=df_selecionado['order_hour'], y=df_selecionado['avg_prep'], error_y=dict(type='data', array=df_selecionado['std_prep'])))
+    fig.update_layout(xaxis_title='hora do pedido', yaxis_title='minutos', xaxis=dict(dtick=1))
+    
+    return fig
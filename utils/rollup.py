@@ -0,0 +1,57 @@
+# ==========================
+# Rollup diário da visão empresa
+#
+# Os gráficos da visão empresa só precisam de contagens de pedidos por dia,
+# semana, cidade e trânsito (os entregadores distintos por semana vêm dos
+# esboços de utils.distinct). O rollup é
+# calculado uma vez na carga (via load_derived) e cada rerun apenas filtra
+# (utils.filters.filter_table) e soma essa tabela pequena, independente do volume de pedidos.
+
+from utils.memory import concat_frames
+
+CHAVES = ['Order_Date', 'week_of_year', 'City', 'Road_traffic_density']
+
+
+def build_rollup(df):
+    
+    """ Monta o rollup da visão empresa
+        
+        'pedidos': pedidos por (Order_Date, week_of_year, City, Road_traffic_density)
+        
+        Input: Dataframe preparado (com a coluna week_of_year)
+        Output: dicionário com o Dataframe
+    """
+    
+    pedidos = df.loc[:, CHAVES].groupby(CHAVES, observed=True).size().rename('pedidos').reset_index()
+    
+    return {'pedidos': pedidos}
+
+
+def merge_rollup(rollup, novo):
+    
+    """ Junta ao rollup o rollup de um lote novo de pedidos (ingestão incremental)
+        
+        Input: rollup existente e rollup do lote
+        Output: rollup combinado
+    """
+    
+    pedidos = concat_frames(rollup['pedidos'], novo['pedidos'])
+    pedidos = pedidos.groupby(CHAVES, observed=True)['pedidos'].sum().reset_index()
+    
+    return {'pedidos': pedidos}
+
+
+def orders_by(rollup, chaves):
+    
+    """ Quantidade de pedidos agrupada pelas chaves pedidas
+        
+        Input: rollup (filtrado) e lista de colunas de CHAVES
+        Output: Dataframe com as chaves e a coluna 'ID' (quantidade de pedidos),
+                no mesmo formato do groupby(...).count() sobre os pedidos
+    """
+    
+    df_aux = rollup['pedidos'].groupby(chaves, observed=True)['pedidos'].sum().reset_index()
+    df_aux = df_aux.rename(columns={'pedidos': 'ID'})
+    
+    return df_aux
+
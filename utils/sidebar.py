@@ -0,0 +1,80 @@
+# ==========================
+# Barra lateral compartilhada pelas páginas
+#
+# Logo, títulos e filtros de data limite e de trânsito, iguais na Home e nas
+# três páginas. O logo é decodificado e reduzido à largura exibida uma única
+# vez por processo: os reruns seguintes enviam os bytes PNG já prontos, sem
+# abrir o arquivo com o PIL nem redimensionar a imagem a cada interação.
+
+import io
+import threading
+from datetime import datetime
+
+import streamlit as st
+from PIL import Image
+
+LOGO_PATH = 'logo.png'
+LARGURA_LOGO = 120
+
+TRANSITO = ['Low', 'Medium', 'High', 'Jam']
+
+_logos = {}
+_logos_lock = threading.Lock()
+
+
+def logo_bytes(path=LOGO_PATH, largura=LARGURA_LOGO):
+    
+    """ PNG do logo já na largura exibida, guardado no cache do processo
+        
+        Input: caminho da imagem e largura em pixels
+        Output: bytes do PNG
+    """
+    
+    with _logos_lock:
+        if (path, largura) not in _logos:
+            imagem = Image.open(path)
+            altura = round(imagem.height * largura / imagem.width)
+            
+            buffer = io.BytesIO()
+            imagem.resize((largura, altura), Image.Resampling.LANCZOS).save(buffer, format='PNG')
+            _logos[(path, largura)] = buffer.getvalue()
+        
+        return _logos[(path, largura)]
+
+
+def sidebar_header():
+    
+    """ Logo e títulos da Cury Company no topo da barra lateral """
+    
+    st.sidebar.image(logo_bytes(), width=LARGURA_LOGO)
+    
+    st.sidebar.markdown("# Cury Company")
+    st.sidebar.markdown("## Fastest Delivery in Town")
+    st.sidebar.markdown("""---""")
+
+
+def sidebar_filters():
+    
+    """ Filtros de data limite e de condições de trânsito
+        
+        Output: (data limite, lista de condições de trânsito selecionadas)
+    """
+    
+    st.sidebar.markdown("## Selecione uma data limite")
+    
+    date_slider = st.sidebar.slider('Até qual valor?', value=datetime(2022, 4, 13), min_value=datetime(2022, 2, 11), max_value=datetime(2022, 4, 6), format='DD-MM-YYYY')
+    
+    st.sidebar.markdown("""---""")
+    
+    traffic_options = st.sidebar.multiselect('Quais as condições do trânsito', TRANSITO, default=TRANSITO)
+    
+    st.sidebar.markdown("""---""")
+    
+    return date_slider, traffic_options
+
+
+def sidebar_footer():
+    
+    """ Rodapé da barra lateral """
+    
+    st.sidebar.markdown("### Powered by Comunidade DS")
@@ -0,0 +1,186 @@
+# ==========================
+# Índice espacial em grade sobre os locais de entrega
+#
+# Cada entrega cai em uma célula de CELULA_GRAUS x CELULA_GRAUS graus
+# (~1,1 km de lado com 0,01°) pelo seu Delivery_location. Na carga, as
+# células distintas são numeradas na ordem (linha de latitude, coluna de
+# longitude) e as linhas do DataFrame são ordenadas por célula, então:
+#   - densidade e tempo médio por célula são um bincount sobre os códigos
+#     das linhas já filtradas (inteiros, sem haversine);
+#   - "entregas a até R km de um ponto" só visita as células da caixa que
+#     envolve o círculo (uma busca binária por linha de latitude) e aplica o
+#     haversine apenas às entregas dessas células.
+# O índice guarda posições do DataFrame ordenado por data, como o índice
+# dos filtros (utils.filters), e é recalculado quando o arquivo muda.
+
+import numpy as np
+import pandas as pd
+
+from utils.filters import filter_rows
+from utils.geo import RAIO_TERRA_KM, haversine_km
+
+# Lado da célula em graus
+CELULA_GRAUS = 0.01
+
+# Comprimento de um grau de latitude (e de longitude no equador) em km
+KM_POR_GRAU = np.pi * RAIO_TERRA_KM / 180
+
+# Colunas (células) por linha de latitude na numeração das chaves. A coluna
+# entra deslocada de 2**31, sempre em [0, 2**32) mesmo nas longitudes
+# negativas: assim cada chave é única e a linha e a coluna saem dela sem
+# ambiguidade, e as chaves de uma linha ficam em um trecho contínuo
+_COLUNAS_CHAVE = 2 ** 32
+_DESLOCAMENTO_COLUNA = 2 ** 31
+
+
+def _celulas(latitudes, longitudes, celula):
+    
+    """ Linha e coluna da grade de cada ponto """
+    
+    linha = np.floor(np.asarray(latitudes, dtype='float64') / celula).astype(np.int64)
+    coluna = np.floor(np.asarray(longitudes, dtype='float64') / celula).astype(np.int64)
+    
+    return linha, coluna
+
+
+def _chaves(linha, coluna):
+    
+    """ Chave das células: linha * 2**32 + coluna + 2**31 """
+    
+    return linha * _COLUNAS_CHAVE + (coluna + _DESLOCAMENTO_COLUNA)
+
+
+def cell_centers(linhas, colunas, celula=CELULA_GRAUS):
+    
+    """ Latitude e longitude do centro das células (linha, coluna da grade) """
+    
+    return np.column_stack([(linhas + 0.5) * celula, (colunas + 0.5) * celula])
+
+
+def bounding_box(latitude, longitude, raio_km):
+    
+    """ Caixa de latitudes e longitudes que envolve o círculo de raio_km
+        
+        Output: ((lat_min, lat_max), (lon_min, lon_max)) em graus
+    """
+    
+    delta_lat = raio_km / KM_POR_GRAU
+    # Nas latitudes da borda da caixa o grau de longitude é o mais curto
+    cos_lat = max(np.cos(np.radians(min(abs(latitude) + delta_lat, 90.0))), 1e-12)
+    delta_lon = min(raio_km / (KM_POR_GRAU * cos_lat), 180.0)
+    
+    return (latitude - delta_lat, latitude + delta_lat), (longitude - delta_lon, longitude + delta_lon)
+
+
+def build_spatial_index(df, celula=CELULA_GRAUS):
+    
+    """ Monta o índice em grade dos locais de entrega
+        
+        'chaves': chave de cada célula (linha * 2**32 + coluna + 2**31), em ordem
+        'codigos': célula de cada linha do DataFrame (posição em 'chaves')
+        'ordem': posições das linhas ordenadas por célula
+        'inicios': início de cada célula em 'ordem'
+        'centros': latitude e longitude do centro de cada célula
+        'restaurantes': restaurantes distintos e quantidade de pedidos de cada
+        
+        Input: Dataframe limpo, ordenado por Order_Date, e lado da célula
+        Output: dicionário com o índice
+    """
+    
+    linha, coluna = _celulas(df['Delivery_location_latitude'], df['Delivery_location_longitude'], celula)
+    chaves, codigos = np.unique(_chaves(linha, coluna), return_inverse=True)
+    codigos = codigos.astype(np.int32)
+    
+    ordem = np.argsort(codigos, kind='stable').astype(np.int32)
+    inicios = np.concatenate([[0], np.cumsum(np.bincount(codigos, minlength=len(chaves)))])
+    
+    linhas_chave, colunas_chave = np.divmod(chaves, _COLUNAS_CHAVE)
+    colunas_chave = colunas_chave - _DESLOCAMENTO_COLUNA
+    centros = cell_centers(linhas_chave, colunas_chave, celula)
+    
+    restaurantes = df.groupby(['Restaurant_latitude', 'Restaurant_longitude']).size().rename('pedidos')
+    restaurantes = restaurantes.sort_values(ascending=False, kind='stable').reset_index()
+    
+    return {'celula': celula, 'chaves': chaves, 'codigos': codigos, 'ordem': ordem, 'inicios': inicios,
+            'centros': centros, 'restaurantes': restaurantes}
+
+
+def grid_stats(df, espacial, indice, date_cutoff, traffic_options):
+    
+    """ Densidade de entregas e tempo médio de entrega por célula
+        
+        Input: Dataframe limpo, índice espacial, índice dos filtros
+               (build_filter_index), data limite e condições de trânsito
+        Output: Dataframe com latitude e longitude do centro da célula,
+                'pedidos' e 'avg_time', só das células com entregas, da mais
+                para a menos densa
+    """
+    
+    fim, linhas = filter_rows(indice, date_cutoff, traffic_options)
+    
+    codigos = espacial['codigos'][:fim]
+    tempos = df['Time_taken(min)'].to_numpy()[:fim]
+    if linhas is not None:
+        codigos = codigos[linhas]
+        tempos = tempos[linhas]
+    
+    total = len(espacial['chaves'])
+    pedidos = np.bincount(codigos, minlength=total)
+    soma = np.bincount(codigos, weights=tempos, minlength=total)
+    
+    ocupadas = np.flatnonzero(pedidos)
+    celulas = pd.DataFrame({
+        'latitude': espacial['centros'][ocupadas, 0],
+        'longitude': espacial['centros'][ocupadas, 1],
+        'pedidos': pedidos[ocupadas],
+        'avg_time': soma[ocupadas] / pedidos[ocupadas],
+    })
+    
+    return celulas.sort_values('pedidos', ascending=False, kind='stable', ignore_index=True)
+
+
+def _candidatas(espacial, latitude, longitude, raio_km):
+    
+    """ Posições das entregas nas células da caixa que envolve o círculo """
+    
+    latitudes, longitudes = bounding_box(latitude, longitude, raio_km)
+    (lat_min, lat_max), (lon_min, lon_max) = _celulas(latitudes, longitudes, espacial['celula'])
+    
+    linhas = np.arange(lat_min, lat_max + 1)
+    inicio = np.searchsorted(espacial['chaves'], _chaves(linhas, lon_min), side='left')
+    fim = np.searchsorted(espacial['chaves'], _chaves(linhas, lon_max), side='right')
+    
+    ordem, inicios = espacial['ordem'], espacial['inicios']
+    partes = [ordem[inicios[a]:inicios[b]] for a, b in zip(inicio, fim) if b > a]
+    
+    return np.concatenate(partes) if partes else np.empty(0, dtype=ordem.dtype)
+
+
+def orders_within(df, espacial, indice, latitude, longitude, raio_km, date_cutoff, traffic_options):
+    
+    """ Entregas com local de entrega a até raio_km do ponto (um restaurante)
+        
+        Só as entregas das células próximas passam pelo haversine; as demais
+        nem são visitadas.
+        
+        Input: Dataframe limpo, índice espacial, índice dos filtros, ponto
+               (graus), raio em km, data limite e condições de trânsito
+        Output: Dataframe com as entregas (na ordem do DataFrame) e a coluna
+                'distancia_ponto' (km)
+    """
+    
+    posicoes = np.sort(_candidatas(espacial, latitude, longitude, raio_km))
+    
+    # Filtros da barra lateral sobre as candidatas
+    fim, linhas = filter_rows(indice, date_cutoff, traffic_options)
+    posicoes = posicoes[posicoes < fim]
+    if linhas is not None:
+        posicoes = posicoes[linhas[posicoes]]
+    
+    distancias = haversine_km(latitude, longitude, df['Delivery_location_latitude'].to_numpy()[posicoes], df['Delivery_location_longitude'].to_numpy()[posicoes])
+    dentro = distancias <= raio_km
+    
+    entregas = df.iloc[posicoes[dentro]].copy()
+    entregas['distancia_ponto'] = distancias[dentro]
+    
+    return entregas
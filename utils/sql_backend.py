@@ -0,0 +1,431 @@
+# ==========================
+# Backend de consultas SQL (SQLite embutido)
+#
+# Alternativa ao caminho em pandas: as entregas limpas ficam em um arquivo
+# SQLite ao lado do CSV (dataset/train.sqlite), com índices em Order_Date,
+# City e Road_traffic_density. Cada painel das páginas tem aqui uma consulta
+# que aplica os filtros da barra lateral (data limite e trânsito) no WHERE,
+# então só o resultado agregado sai do banco. Vários processos (ou vários
+# servidores do Streamlit) podem consultar o mesmo arquivo em modo somente
+# leitura, sem manter o DataFrame em memória.
+#
+# Os resultados têm as mesmas colunas e linhas do caminho em pandas
+# (benchmarks/bench_sql.py confere painel a painel). Contagens, mínimos e
+# máximos são idênticos; médias e desvios padrão coincidem até o
+# arredondamento de ponto flutuante. Entregadores distintos são contados de
+# forma exata (COUNT DISTINCT), como utils.distinct.exact_couriers.
+#
+# O arquivo guarda a assinatura do CSV de origem e é refeito quando ela
+# muda, como o arquivo colunar de utils.data_loader. O banco é preenchido a
+# partir do CSV lido em blocos (data_loader.prepared_chunks), sem montar o
+# DataFrame inteiro: cada bloco preparado vai para uma tabela temporária e
+# as linhas são copiadas para a tabela final na ordem do DataFrame limpo.
+#
+# As páginas usam este backend quando CURRY_BACKEND=sql (utils.backends).
+#
+# Uso (gera o banco):
+#   python -m utils.sql_backend --csv dataset/train.csv
+
+import argparse
+import json
+import os
+import sqlite3
+import threading
+
+import numpy as np
+import pandas as pd
+
+from utils.data_loader import CHUNK_SIZE, DATASET_PATH, VERSAO_ESQUEMA, file_signature, prepared_chunks
+from utils.geo import haversine_km
+from utils.maps import COLUNAS as MAPA_COLUNAS
+from utils.ranking import TOP_N
+from utils.spatial import CELULA_GRAUS, bounding_box, cell_centers
+
+TABELA = 'entregas'
+
+# Colunas indexadas: as dos filtros da barra lateral e a cidade dos painéis
+INDICES = ['Order_Date', 'City', 'Road_traffic_density']
+
+_banco_lock = threading.Lock()
+
+
+def database_path(path):
+    
+    """ Caminho do banco SQLite correspondente a um CSV """
+    
+    return os.path.splitext(path)[0] + '.sqlite'
+
+
+def _marca(origem):
+    
+    """ Versão do esquema e mtime/tamanho do CSV de origem, gravados no banco """
+    
+    return json.dumps([VERSAO_ESQUEMA] + list(origem[1:]))
+
+
+def _para_sql(df):
+    
+    """ Colunas no formato do banco: datas como inteiros (ns desde a época),
+        categorias como texto """
+    
+    colunas = {}
+    for nome, coluna in df.items():
+        if pd.api.types.is_datetime64_any_dtype(coluna):
+            colunas[nome] = coluna.to_numpy().view('int64')
+        elif isinstance(coluna.dtype, pd.CategoricalDtype):
+            colunas[nome] = coluna.astype(object)
+        else:
+            colunas[nome] = coluna
+    
+    return pd.DataFrame(colunas)
+
+
+def write_database(partes, destino, origem):
+    
+    """ Grava as entregas limpas no banco, com os índices dos filtros
+        
+        Cada parte entra em uma tabela temporária assim que é preparada;
+        no fim, as linhas vão para a tabela final ordenadas por Order_Date
+        (ordenação estável sobre as partes em ordem, como o
+        data_loader.merge_prepared), então rowid = posição no DataFrame + 1,
+        o que permite reproduzir desempates que dependem da ordem das linhas.
+        
+        Input: partes preparadas na ordem do arquivo (prepared_chunks, ou
+               [df] para um DataFrame pronto), caminho do banco e assinatura do CSV
+    """
+    
+    # Grava em um arquivo temporário e troca de uma vez, para que outra
+    # sessão nunca consulte um banco pela metade
+    temporario = destino + '.tmp'
+    if os.path.exists(temporario):
+        os.remove(temporario)
+    
+    conexao = sqlite3.connect(temporario)
+    try:
+        for numero, parte in enumerate(partes):
+            linhas = _para_sql(parte)
+            if numero == 0:
+                # Esquema da tabela final definido pelo pandas a partir da primeira parte
+                linhas.iloc[:0].to_sql(TABELA, conexao, index=False)
+                conexao.execute(f'CREATE TEMP TABLE carga AS SELECT * FROM {TABELA} WHERE 0')
+            
+            marcadores = ', '.join('?' * linhas.shape[1])
+            conexao.executemany(f'INSERT INTO carga VALUES ({marcadores})', linhas.itertuples(index=False, name=None))
+        
+        conexao.execute(f'INSERT INTO {TABELA} SELECT * FROM carga ORDER BY Order_Date IS NULL, Order_Date, rowid')
+        conexao.execute('DROP TABLE carga')
+        for coluna in INDICES:
+            conexao.execute(f'CREATE INDEX "idx_{coluna}" ON {TABELA} ("{coluna}")')
+        conexao.execute('CREATE TABLE origem (marca TEXT)')
+        conexao.execute('INSERT INTO origem VALUES (?)', (_marca(origem),))
+        conexao.commit()
+    finally:
+        conexao.close()
+    
+    os.replace(temporario, destino)
+
+
+def _atualizado(destino, origem):
+    if not os.path.exists(destino):
+        return False
+    
+    conexao = sqlite3.connect(f'file:{destino}?mode=ro', uri=True)
+    try:
+        linha = conexao.execute('SELECT marca FROM origem').fetchone()
+    except sqlite3.DatabaseError:
+        return False
+    finally:
+        conexao.close()
+    
+    return linha is not None and linha[0] == _marca(origem)
+
+
+def build_database(path=DATASET_PATH, chunksize=CHUNK_SIZE):
+    
+    """ Garante um banco atualizado para o CSV, gerando-o se preciso
+        
+        Input: caminho do CSV e linhas por bloco lido do CSV
+        Output: caminho do banco
+    """
+    
+    origem = file_signature(path)
+    destino = database_path(origem[0])
+    
+    with _banco_lock:
+        if not _atualizado(destino, origem):
+            write_database(prepared_chunks(origem[0], chunksize), destino, origem)
+    
+    return destino
+
+
+class SqlBackend:
+    
+    """ Consultas dos painéis sobre o banco SQLite
+        
+        Cada método recebe a data limite (exclusiva) e as condições de
+        trânsito da barra lateral e devolve o mesmo resultado que o painel
+        correspondente calcula em pandas. As conexões são abertas somente
+        para leitura, uma por consulta, e podem ser usadas de qualquer thread.
+        
+        Input: caminho do CSV (o banco é gerado ou atualizado na criação)
+    """
+    
+    def __init__(self, path=DATASET_PATH):
+        self.banco = build_database(path)
+    
+    def _consulta(self, sql, date_cutoff, traffic_options, parametros=()):
+        
+        """ Executa a consulta com os filtros da barra lateral
+            
+            O texto da consulta usa {filtros} onde entra a condição do WHERE
+            (data limite e trânsito), aplicada com os índices do banco.
+        """
+        
+        marcadores = ', '.join('?' * len(traffic_options))
+        filtros = f'Order_Date < ? AND Road_traffic_density IN ({marcadores})'
+        valores = [pd.Timestamp(date_cutoff).value, *traffic_options, *parametros]
+        
+        return self._executa(sql.format(filtros=filtros, tabela=TABELA), valores)
+    
+    def _executa(self, sql, valores=()):
+        conexao = sqlite3.connect(f'file:{self.banco}?mode=ro', uri=True)
+        try:
+            return pd.read_sql_query(sql, conexao, params=valores)
+        finally:
+            conexao.close()
+    
+    def _media_desvio(self, coluna, chaves, date_cutoff, traffic_options, nomes=('avg_time', 'std_time')):
+        
+        """ Média e desvio padrão amostral por grupo, no formato de
+            utils.stats.summarize (desvio NaN para grupos com um valor)
+            
+            O desvio é calculado em duas passadas (média do grupo e depois a
+            soma dos quadrados dos desvios), que é estável numericamente.
+        """
+        
+        grupos = ', '.join(f'"{chave}"' for chave in chaves)
+        df_aux = self._consulta(f'''
+            WITH filtradas AS (SELECT {grupos}, "{coluna}" AS valor FROM {{tabela}} WHERE {{filtros}} AND "{coluna}" IS NOT NULL),
+            medias AS (SELECT {grupos}, COUNT(valor) AS n, AVG(valor) AS media FROM filtradas GROUP BY {grupos})
+            SELECT {grupos}, medias.media, SUM((valor - medias.media) * (valor - medias.media)) / (medias.n - 1) AS variancia
+            FROM filtradas JOIN medias USING ({grupos})
+            GROUP BY {grupos}
+            ORDER BY {grupos}''', date_cutoff, traffic_options)
+        
+        # n = 1 divide por zero e o SQLite devolve NULL; se todos os grupos
+        # têm um valor (ou nenhuma linha passa nos filtros) a coluna vem como
+        # objeto, então é convertida para float (NULL vira NaN, como no pandas)
+        df_aux[nomes[0]] = df_aux.pop('media').astype('float64')
+        df_aux[nomes[1]] = np.sqrt(df_aux.pop('variancia').astype('float64'))
+        
+        return df_aux
+    
+    def _pedidos_por(self, chaves, date_cutoff, traffic_options):
+        
+        """ Quantidade de pedidos por grupo, no formato de utils.rollup.orders_by """
+        
+        grupos = ', '.join(f'"{chave}"' for chave in chaves)
+        df_aux = self._consulta(f'SELECT {grupos}, COUNT(*) AS ID FROM {{tabela}} WHERE {{filtros}} GROUP BY {grupos} ORDER BY {grupos}', date_cutoff, traffic_options)
+        
+        if 'Order_Date' in chaves:
+            df_aux['Order_Date'] = pd.to_datetime(df_aux['Order_Date'])
+        
+        return df_aux
+    
+    # ==================== Visão empresa ====================
+    
+    def order_metric(self, date_cutoff, traffic_options):
+        df_aux = self._pedidos_por(['Order_Date'], date_cutoff, traffic_options)
+        df_aux.columns = ['order_date', 'qtde_entregas']
+        
+        return df_aux
+    
+    def order_by_week(self, date_cutoff, traffic_options):
+        return self._pedidos_por(['week_of_year'], date_cutoff, traffic_options)
+    
+    def traffic_order_city(self, date_cutoff, traffic_options):
+        return self._pedidos_por(['City', 'Road_traffic_density'], date_cutoff, traffic_options)
+    
+    def traffic_order_share(self, date_cutoff, traffic_options):
+        df_aux = self._pedidos_por(['Road_traffic_density'], date_cutoff, traffic_options)
+        df_aux['perc_ID'] = 100 * (df_aux['ID'] / df_aux['ID'].sum())
+        
+        return df_aux
+    
+    def order_share_by_week(self, date_cutoff, traffic_options):
+        df_aux = self._consulta('''
+            SELECT week_of_year, COUNT(*) AS ID, COUNT(DISTINCT Delivery_person_ID) AS Delivery_person_ID
+            FROM {tabela} WHERE {filtros}
+            GROUP BY week_of_year ORDER BY week_of_year''', date_cutoff, traffic_options)
+        df_aux['order_by_delivery'] = df_aux['ID'] / df_aux['Delivery_person_ID']
+        
+        return df_aux
+    
+    # ==================== Visão entregadores ====================
+    
+    def courier_extremes(self, date_cutoff, traffic_options):
+        
+        """ Menor e maior idade e condição do veículo (MetricsProvider.courier_extreme) """
+        
+        df_aux = self._consulta('''
+            SELECT MIN(Delivery_person_Age) AS idade_min, MAX(Delivery_person_Age) AS idade_max,
+                   MIN(Vehicle_condition) AS condicao_min, MAX(Vehicle_condition) AS condicao_max
+            FROM {tabela} WHERE {filtros}''', date_cutoff, traffic_options)
+        
+        return df_aux.iloc[0]
+    
+    def avg_ratings_per_deliver(self, date_cutoff, traffic_options):
+        return self._consulta('''
+            SELECT Delivery_person_ID, AVG(Delivery_person_Ratings) AS Delivery_person_Ratings
+            FROM {tabela} WHERE {filtros}
+            GROUP BY Delivery_person_ID ORDER BY Delivery_person_ID''', date_cutoff, traffic_options)
+    
+    def ratings_by(self, chave, date_cutoff, traffic_options):
+        
+        """ Avaliação média e desvio padrão por trânsito ou por clima """
+        
+        return self._media_desvio('Delivery_person_Ratings', [chave], date_cutoff, traffic_options, nomes=('Delivery_mean', 'Delivery_std'))
+    
+    def top_delivers(self, date_cutoff, traffic_options, n=TOP_N):
+        
+        """ Os n entregadores mais rápidos e os n mais lentos de cada cidade,
+            no formato de utils.ranking.rank_couriers
+            
+            Empates no tempo médio seguem a ordem em que cada entregador
+            aparece pela primeira vez nas linhas filtradas, que é a ordem dos
+            grupos do groupby categórico do pandas.
+        """
+        
+        extremos = []
+        for ordem in ['ASC', 'DESC']:
+            extremos.append(self._consulta(f'''
+                WITH filtradas AS (
+                    SELECT rowid AS linha, City, Delivery_person_ID, "Time_taken(min)" AS tempo
+                    FROM {{tabela}} WHERE {{filtros}}),
+                primeiras AS (
+                    SELECT Delivery_person_ID, MIN(linha) AS primeira FROM filtradas GROUP BY Delivery_person_ID),
+                medias AS (
+                    SELECT City, Delivery_person_ID, AVG(tempo) AS tempo FROM filtradas GROUP BY City, Delivery_person_ID),
+                posicoes AS (
+                    SELECT medias.*, ROW_NUMBER() OVER (PARTITION BY City ORDER BY tempo {ordem}, primeira) AS posicao
+                    FROM medias JOIN primeiras USING (Delivery_person_ID))
+                SELECT City, Delivery_person_ID, tempo AS "Time_taken(min)"
+                FROM posicoes WHERE posicao <= ?
+                ORDER BY City, posicao''', date_cutoff, traffic_options, (n,)))
+        
+        return extremos[0], extremos[1]
+    
+    # ==================== Visão restaurantes ====================
+    
+    def delivery_unique(self, date_cutoff, traffic_options):
+        df_aux = self._consulta('SELECT COUNT(DISTINCT Delivery_person_ID) AS n FROM {tabela} WHERE {filtros}', date_cutoff, traffic_options)
+        
+        return int(df_aux['n'].iloc[0])
+    
+    def distance(self, date_cutoff, traffic_options, figura=False):
+        
+        """ Distância média (figura=False) ou distância média por cidade """
+        
+        if figura == False:
+            df_aux = self._consulta('SELECT AVG(Distance) AS Distance FROM {tabela} WHERE {filtros}', date_cutoff, traffic_options)
+            # Sem linhas filtradas o AVG é NULL: NaN, como no pandas
+            return np.round(df_aux['Distance'].astype('float64').iloc[0], 2)
+        
+        return self._consulta('SELECT City, AVG(Distance) AS Distance FROM {tabela} WHERE {filtros} GROUP BY City ORDER BY City', date_cutoff, traffic_options)
+    
+    def festival_time(self, date_cutoff, traffic_options):
+        return self._media_desvio('Time_taken(min)', ['Festival'], date_cutoff, traffic_options)
+    
+    def avg_std_time_graph(self, date_cutoff, traffic_options):
+        return self._media_desvio('Time_taken(min)', ['City'], date_cutoff, traffic_options)
+    
+    def avg_std_time_on_traffic(self, date_cutoff, traffic_options):
+        return self._media_desvio('Time_taken(min)', ['City', 'Road_traffic_density'], date_cutoff, traffic_options)
+    
+    def time_by_city_and_order(self, date_cutoff, traffic_options):
+        return self._media_desvio('Time_taken(min)', ['City', 'Type_of_order'], date_cutoff, traffic_options)
+    
+    def prep_time_by(self, chave, date_cutoff, traffic_options):
+        
+        """ Tempo de preparo médio e desvio padrão por cidade ou por hora do pedido """
+        
+        return self._media_desvio('prep_minutes', [chave], date_cutoff, traffic_options, nomes=('avg_prep', 'std_prep'))
+    
+    def restaurants(self):
+        
+        """ Restaurantes distintos e quantidade de pedidos de cada, do mais
+            para o menos pedido (o 'restaurantes' de utils.spatial.build_spatial_index) """
+        
+        return self._executa(f'''
+            SELECT Restaurant_latitude, Restaurant_longitude, COUNT(*) AS pedidos
+            FROM {TABELA} WHERE Restaurant_latitude IS NOT NULL AND Restaurant_longitude IS NOT NULL
+            GROUP BY Restaurant_latitude, Restaurant_longitude
+            ORDER BY pedidos DESC, Restaurant_latitude, Restaurant_longitude''')
+    
+    def grid_stats(self, date_cutoff, traffic_options, celula=CELULA_GRAUS):
+        
+        """ Densidade e tempo médio de entrega por célula da grade, no
+            formato de utils.spatial.grid_stats
+            
+            A célula sai do piso de coordenada / celula, calculado com CAST
+            (que trunca em direção ao zero) e corrigido nos valores negativos.
+        """
+        
+        pisos = {eixo: f'(CAST(Delivery_location_{eixo} / {celula!r} AS INTEGER) - (Delivery_location_{eixo} / {celula!r} < CAST(Delivery_location_{eixo} / {celula!r} AS INTEGER)))'
+                 for eixo in ['latitude', 'longitude']}
+        df_aux = self._consulta(f'''
+            SELECT {pisos['latitude']} AS linha, {pisos['longitude']} AS coluna, COUNT(*) AS pedidos, AVG("Time_taken(min)") AS avg_time
+            FROM {{tabela}} WHERE {{filtros}} AND Delivery_location_latitude IS NOT NULL AND Delivery_location_longitude IS NOT NULL
+            GROUP BY linha, coluna
+            ORDER BY pedidos DESC, linha, coluna''', date_cutoff, traffic_options)
+        
+        centros = cell_centers(df_aux.pop('linha').to_numpy(), df_aux.pop('coluna').to_numpy(), celula)
+        df_aux.insert(0, 'latitude', centros[:, 0])
+        df_aux.insert(1, 'longitude', centros[:, 1])
+        
+        return df_aux
+    
+    def orders_within(self, latitude, longitude, raio_km, date_cutoff, traffic_options):
+        
+        """ Entregas com local de entrega a até raio_km do ponto, como
+            utils.spatial.orders_within: o banco devolve as entregas da caixa
+            que envolve o círculo (utils.spatial.bounding_box) e o haversine
+            decide as que ficam. O índice é a posição da linha no DataFrame.
+            
+            Output: Dataframe com o local de entrega, Time_taken(min) e
+                    'distancia_ponto' (km)
+        """
+        
+        (lat_min, lat_max), (lon_min, lon_max) = bounding_box(latitude, longitude, raio_km)
+        df_aux = self._consulta('''
+            SELECT rowid - 1 AS linha, Delivery_location_latitude, Delivery_location_longitude, "Time_taken(min)"
+            FROM {tabela} WHERE {filtros}
+              AND Delivery_location_latitude BETWEEN ? AND ? AND Delivery_location_longitude BETWEEN ? AND ?
+            ORDER BY rowid''', date_cutoff, traffic_options, (lat_min, lat_max, lon_min, lon_max))
+        df_aux = df_aux.set_index('linha').rename_axis(None)
+        
+        distancias = haversine_km(latitude, longitude, df_aux['Delivery_location_latitude'].to_numpy(), df_aux['Delivery_location_longitude'].to_numpy())
+        dentro = distancias <= raio_km
+        
+        entregas = df_aux.loc[dentro, :].copy()
+        entregas['distancia_ponto'] = distancias[dentro]
+        
+        return entregas
+    
+    # ==================== Mapas ====================
+    
+    def map_points(self, date_cutoff, traffic_options):
+        
+        """ Cidade, trânsito e local de entrega das entregas filtradas (utils.maps.COLUNAS) """
+        
+        colunas = ', '.join(f'"{coluna}"' for coluna in MAPA_COLUNAS)
+        
+        return self._consulta(f'SELECT {colunas} FROM {{tabela}} WHERE {{filtros}} ORDER BY rowid', date_cutoff, traffic_options)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Gera o banco SQLite do dataset limpo')
+    parser.add_argument('--csv', default=DATASET_PATH)
+    args = parser.parse_args()
+    
+    print(build_database(args.csv))
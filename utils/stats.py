@@ -0,0 +1,154 @@
+# ==========================
+# Estatísticas mescláveis (quantidade, média e M2)
+#
+# Cada acumulador guarda, por grupo, a quantidade de valores (n), a média e a
+# soma dos quadrados dos desvios em relação à média (m2). Dois acumuladores
+# são combinados de forma exata pela fórmula de Chan et al., o que permite
+# calcular médias e desvios padrão por blocos, por processo ou por partição
+# de data e depois juntá-los. É numericamente mais estável que guardar a
+# soma dos quadrados.
+#
+# Os acumuladores dos painéis ficam particionados por Order_Date e
+# Road_traffic_density, então os filtros da barra lateral são aplicados com
+# utils.filters.filter_table antes de colapsar nas chaves de cada painel.
+
+import numpy as np
+import pandas as pd
+
+from utils.memory import concat_frames
+
+# Partição comum a todos os acumuladores dos painéis
+PARTICAO = ['Order_Date', 'Road_traffic_density']
+
+# Acumuladores dos painéis: coluna medida e chaves de grupo (além da partição)
+PAINEIS = {
+    'tempo': ('Time_taken(min)', ['City', 'Festival', 'Type_of_order']),
+    'avaliacao': ('Delivery_person_Ratings', ['Weatherconditions']),
+    'preparo': ('prep_minutes', ['City', 'order_hour']),
+}
+
+
+def accumulate(df, chaves, coluna):
+    
+    """ Cria o acumulador de uma coluna agrupada pelas chaves
+        
+        Input: Dataframe, lista de chaves e coluna numérica
+        Output: Dataframe com as chaves e as colunas n, media e m2
+    """
+    
+    valores = df[coluna].astype('float64')
+    grupos = valores.groupby([df[chave] for chave in chaves], observed=True)
+    
+    acumulador = pd.DataFrame({'n': grupos.count(), 'media': grupos.mean(), 'm2': grupos.var(ddof=0) * grupos.count()})
+    
+    return acumulador.reset_index()
+
+
+def group_codes(df, chaves):
+    
+    """ Número do grupo de cada linha e as chaves de cada grupo
+        
+        As chaves de cada grupo são tiradas da primeira linha com aquele
+        número, então as duas saídas ficam alinhadas por construção (o índice
+        de grupos.size() e o grupos.ngroup() não têm a mesma ordem garantida
+        com chaves categóricas e observed=True).
+        
+        Input: Dataframe e lista de chaves
+        Output: (Dataframe com as chaves de cada grupo, na ordem dos números;
+                 array com o número do grupo de cada linha)
+    """
+    
+    codigos = df.groupby(chaves, observed=True).ngroup().to_numpy()
+    
+    primeiras = pd.Series(codigos).drop_duplicates()
+    linhas = primeiras.index.to_numpy()[np.argsort(primeiras.to_numpy())]
+    
+    return df[chaves].iloc[linhas].reset_index(drop=True), codigos
+
+
+def collapse(acumulador, chaves):
+    
+    """ Combina as linhas do acumulador que têm as mesmas chaves
+        
+        Generalização da fórmula de Chan para k partes:
+        n = Σ n_i, media = Σ n_i·media_i / n, m2 = Σ m2_i + Σ n_i·(media_i - media)²
+        
+        Input: acumulador e lista de chaves a manter (lista vazia = total)
+        Output: acumulador agrupado pelas chaves, ordenado por elas
+    """
+    
+    acumulador = acumulador.loc[acumulador['n'] > 0, :]
+    
+    if chaves:
+        rotulos, codigos = group_codes(acumulador, chaves)
+    else:
+        codigos = np.zeros(len(acumulador), dtype=int)
+        rotulos = pd.DataFrame(index=pd.RangeIndex(min(len(codigos), 1)))
+    
+    n_i = acumulador['n'].to_numpy(dtype='float64')
+    media_i = acumulador['media'].to_numpy(dtype='float64')
+    m2_i = acumulador['m2'].to_numpy(dtype='float64')
+    grupos_total = len(rotulos)
+    
+    n = np.bincount(codigos, weights=n_i, minlength=grupos_total)
+    media = np.bincount(codigos, weights=n_i * media_i, minlength=grupos_total) / n
+    m2 = np.bincount(codigos, weights=m2_i + n_i * (media_i - media[codigos]) ** 2, minlength=grupos_total)
+    
+    resultado = rotulos.assign(n=n.astype('int64'), media=media, m2=m2)
+    
+    return resultado.sort_values(chaves, kind='stable', ignore_index=True) if chaves else resultado
+
+
+def merge(acumulador, outro, chaves):
+    
+    """ Junta dois acumuladores (blocos, processos ou partições diferentes)
+        
+        Input: os dois acumuladores e as chaves que os identificam
+        Output: acumulador combinado
+    """
+    
+    return collapse(concat_frames(acumulador, outro), chaves)
+
+
+def summarize(acumulador, chaves, nomes=('avg_time', 'std_time')):
+    
+    """ Média e desvio padrão por grupo, no formato de groupby().agg(['mean', 'std'])
+        
+        O desvio padrão é amostral (ddof=1), como no pandas, e fica NaN para
+        grupos com um único valor.
+        
+        Input: acumulador, chaves do painel e nomes das colunas de saída
+        Output: Dataframe com as chaves e as colunas de média e desvio padrão
+    """
+    
+    combinado = collapse(acumulador, chaves)
+    n = combinado['n']
+    desvio = np.sqrt(combinado['m2'] / (n - 1)).where(n > 1)
+    
+    df_aux = combinado.drop(columns=['n', 'media', 'm2'])
+    df_aux[nomes[0]] = combinado['media']
+    df_aux[nomes[1]] = desvio
+    
+    return df_aux
+
+
+def build_panel_stats(df):
+    
+    """ Acumuladores dos painéis de média/desvio padrão, calculados na carga
+        
+        'tempo': Time_taken(min) por dia, trânsito, cidade, festival e tipo de pedido
+        'avaliacao': Delivery_person_Ratings por dia, trânsito e clima
+        'preparo': prep_minutes por dia, trânsito, cidade e hora do pedido
+        
+        Input: Dataframe limpo
+        Output: dicionário de acumuladores
+    """
+    
+    return {nome: accumulate(df, PARTICAO + chaves, coluna) for nome, (coluna, chaves) in PAINEIS.items()}
+
+
+def merge_panel_stats(acumuladores, novos):
+    
+    """ Junta aos acumuladores dos painéis os de um lote novo de pedidos """
+    
+    return {nome: merge(acumuladores[nome], novos[nome], PARTICAO + chaves) for nome, (_, chaves) in PAINEIS.items()}
@@ -0,0 +1,246 @@
+# ==========================
+# Aquecimento do cache na partida do servidor
+#
+# Sem aquecimento, a primeira sessão que abre cada página paga a leitura, a
+# limpeza e os agregados dentro da thread do Streamlit. Aqui o CSV é dividido
+# em faixas de bytes (uma por processo), e cada processo lê a sua faixa em
+# blocos de CHUNK_SIZE linhas, preparando e agregando um bloco por vez; o
+# pico de memória de cada processo é definido pelo tamanho do bloco, não
+# pelo da faixa. As partes são unidas no processo principal, os artefatos
+# das páginas são mesclados com as mesmas funções da ingestão incremental, e
+# o resultado é instalado no cache compartilhado de utils.data_loader. Se o arquivo colunar já estiver atualizado, a leitura
+# por memory-map é mais rápida que o CSV e os artefatos são calculados
+# direto sobre ela.
+#
+# A Home e as páginas chamam start_warmup() no início; só a primeira chamada
+# do processo dispara o aquecimento, em segundo plano.
+#
+# Uso (mede o aquecimento):
+#   python -m utils.warmup --csv dataset/train.csv --processos 4 --chunksize 100000
+
+import argparse
+import io
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from utils.data_loader import CHUNK_SIZE, DATASET_PATH, file_signature, install_cache, load_columnar, merge_prepared, prepared_chunks, save_columnar
+from utils.distinct import build_courier_sketches, merge_courier_sketches
+from utils.filters import build_filter_index
+from utils.metrics import build_courier_extremes, merge_courier_extremes
+from utils.rollup import build_rollup, merge_rollup
+from utils.spatial import build_spatial_index
+from utils.stats import build_panel_stats, merge_panel_stats
+
+# Artefatos das páginas (mesmos nomes usados em load_derived) que podem ser
+# calculados por partição e mesclados
+ARTEFATOS = {
+    'rollup_empresa': (build_rollup, merge_rollup),
+    'estatisticas_paineis': (build_panel_stats, merge_panel_stats),
+    'extremos_entregadores': (build_courier_extremes, merge_courier_extremes),
+    'esbocos_entregadores': (build_courier_sketches, merge_courier_sketches),
+}
+
+# Artefatos que dependem do DataFrame inteiro, calculados depois da união
+ARTEFATOS_GLOBAIS = {
+    'indice_filtros': build_filter_index,
+    'indice_espacial': build_spatial_index,
+}
+
+# Abaixo deste tamanho o CSV é lido em um único processo
+MIN_BYTES_PARTICAO = 4 * 2**20
+
+_aquecimento = None
+_aquecimento_lock = threading.Lock()
+
+
+def partition_offsets(path, partes):
+    
+    """ Divide o corpo do CSV em faixas de bytes terminadas em fim de linha
+        
+        Input: caminho do CSV e quantidade de partes desejada
+        Output: (cabeçalho em bytes, lista de (inicio, fim))
+    """
+    
+    tamanho = os.path.getsize(path)
+    
+    with open(path, 'rb') as arquivo:
+        cabecalho = arquivo.readline()
+        inicio = arquivo.tell()
+        
+        cortes = [inicio]
+        for parte in range(1, partes):
+            arquivo.seek(max(inicio + (tamanho - inicio) * parte // partes, cortes[-1]))
+            arquivo.readline()
+            if arquivo.tell() < tamanho:
+                cortes.append(arquivo.tell())
+        cortes.append(tamanho)
+    
+    faixas = [(a, b) for a, b in zip(cortes, cortes[1:]) if b > a]
+    
+    return cabecalho, faixas
+
+
+class _FaixaCSV(io.RawIOBase):
+    
+    """ Arquivo somente leitura com o cabeçalho do CSV seguido de uma faixa
+        de bytes do corpo, lida do disco aos poucos pelo read_csv """
+    
+    def __init__(self, path, cabecalho, inicio, fim):
+        super().__init__()
+        self._arquivo = open(path, 'rb')
+        self._arquivo.seek(inicio)
+        self._cabecalho = cabecalho
+        self._restante = fim - inicio
+    
+    def readable(self):
+        return True
+    
+    def readinto(self, buffer):
+        if self._cabecalho:
+            n = min(len(buffer), len(self._cabecalho))
+            buffer[:n] = self._cabecalho[:n]
+            self._cabecalho = self._cabecalho[n:]
+            return n
+        
+        n = self._arquivo.readinto(memoryview(buffer)[:min(len(buffer), self._restante)])
+        self._restante -= n
+        
+        return n
+    
+    def close(self):
+        self._arquivo.close()
+        super().close()
+
+
+def _merge_artifacts(artefatos, novos):
+    
+    """ Mescla os artefatos de duas partes com as funções de ARTEFATOS """
+    
+    if artefatos is None:
+        return novos
+    
+    return {nome: ARTEFATOS[nome][1](artefatos[nome], novos[nome]) for nome in ARTEFATOS}
+
+
+def _prepare_partition(path, cabecalho, inicio, fim, chunksize=CHUNK_SIZE):
+    
+    """ Executado em cada processo: lê a faixa de bytes em blocos, prepara
+        cada bloco e acumula os artefatos mescláveis da partição
+        
+        Output: (lista de partes preparadas, artefatos da faixa)
+    """
+    
+    partes, artefatos = [], None
+    
+    with io.BufferedReader(_FaixaCSV(path, cabecalho, inicio, fim)) as faixa:
+        for parte in prepared_chunks(faixa, chunksize):
+            artefatos = _merge_artifacts(artefatos, {nome: funcao(parte) for nome, (funcao, _) in ARTEFATOS.items()})
+            partes.append(parte)
+    
+    return partes, artefatos
+
+
+def _merge_partitions(resultados):
+    
+    """ Une as partes de todas as faixas na ordem do arquivo
+        (data_loader.merge_prepared) e mescla os artefatos das faixas """
+    
+    artefatos = None
+    for _, novos in resultados:
+        artefatos = _merge_artifacts(artefatos, novos)
+    
+    df = merge_prepared([parte for partes, _ in resultados for parte in partes])
+    
+    return df, artefatos
+
+
+def parallel_load(origem, processos=None, chunksize=CHUNK_SIZE):
+    
+    """ Carrega o DataFrame limpo e os artefatos das páginas
+        
+        Input: assinatura do CSV, quantidade de processos (padrão: núcleos) e
+               linhas por bloco lido do CSV
+        Output: (Dataframe limpo, {nome: (artefato, funcao, mescla)}) no
+                formato de data_loader.install_cache
+    """
+    
+    df = load_columnar(origem)
+    
+    if df is not None:
+        artefatos = {nome: funcao(df) for nome, (funcao, _) in ARTEFATOS.items()}
+    else:
+        caminho = origem[0]
+        processos = processos or os.cpu_count() or 1
+        processos = max(1, min(processos, origem[2] // MIN_BYTES_PARTICAO))
+        cabecalho, faixas = partition_offsets(caminho, processos)
+        # CSV só com o cabeçalho: uma faixa vazia gera o DataFrame preparado
+        # sem linhas e os artefatos vazios, como o load_data
+        faixas = faixas or [(origem[2], origem[2])]
+        
+        if len(faixas) > 1:
+            # spawn: o servidor já tem threads rodando, e um fork copiaria travas em uso
+            with ProcessPoolExecutor(len(faixas), mp_context=multiprocessing.get_context('spawn')) as executor:
+                resultados = list(executor.map(_prepare_partition, *zip(*[(caminho, cabecalho, a, b, chunksize) for a, b in faixas])))
+        else:
+            resultados = [_prepare_partition(caminho, cabecalho, *faixas[0], chunksize)]
+        
+        df, artefatos = _merge_partitions(resultados)
+        save_columnar(df, origem)
+    
+    derivados = {nome: (valor, ARTEFATOS[nome][0], ARTEFATOS[nome][1]) for nome, valor in artefatos.items()}
+    for nome, funcao in ARTEFATOS_GLOBAIS.items():
+        derivados[nome] = (funcao(df), funcao, None)
+    
+    return df, derivados
+
+
+def warm_up(path=DATASET_PATH, processos=None, chunksize=CHUNK_SIZE):
+    
+    """ Aquece o cache compartilhado para o dataset
+        
+        Input: caminho do CSV, quantidade de processos e linhas por bloco
+        Output: True se o cache foi preenchido (False se já estava quente)
+    """
+    
+    return install_cache(path, lambda origem: parallel_load(origem, processos, chunksize))
+
+
+def start_warmup(path=DATASET_PATH, processos=None, esperar=False):
+    
+    """ Dispara warm_up em segundo plano, uma única vez por processo
+        
+        A Home só dispara o aquecimento; as páginas que usam os dados
+        esperam por ele (esperar=True), que é mais rápido que a carga
+        sequencial do load_data. Depois de concluído, a espera é imediata.
+        
+        Input: caminho do CSV, quantidade de processos e se deve esperar o fim
+        Output: thread do aquecimento (None se o CSV não existir)
+    """
+    
+    global _aquecimento
+    
+    with _aquecimento_lock:
+        if _aquecimento is None and os.path.exists(path):
+            _aquecimento = threading.Thread(target=warm_up, args=(path, processos), name='aquecimento-cache', daemon=True)
+            _aquecimento.start()
+        aquecimento = _aquecimento
+    
+    if esperar and aquecimento is not None:
+        aquecimento.join()
+    
+    return aquecimento
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Aquece o cache do dataset em vários processos e mede o tempo')
+    parser.add_argument('--csv', default=DATASET_PATH)
+    parser.add_argument('--processos', type=int, default=None)
+    parser.add_argument('--chunksize', type=int, default=CHUNK_SIZE, help='linhas por bloco lido do CSV (define o pico de memória)')
+    args = parser.parse_args()
+    
+    inicio = time.perf_counter()
+    df, derivados = parallel_load(file_signature(args.csv), args.processos, args.chunksize)
+    print(f'{len(df)} linhas e {len(derivados)} artefatos em {time.perf_counter() - inicio:.2f} s')